@@ -1,21 +1,52 @@
+import inspect
+from collections.abc import Callable, Sequence
 from datetime import datetime, timezone
-from decimal import Decimal
+from decimal import Decimal, getcontext
+from typing import NamedTuple
 
-from .schema import CPUResult
+import numpy as np
+
+from .const import CPU_ENGINE_DECIMAL, CPU_ENGINE_FIXED_POINT
+from .fixed_point import multiply_fixed_point, to_decimal, to_fixed_point
+from .schema import CPUBatchResult, CPURecord, CPUResult
 from ..config.schema import CPUConfig, FactorConfig
-from ..factors.algorithms.base import Factor
+from ..factors.algorithms.base import Factor, to_decimal_array
+from ..factors.algorithms.fixed import FactorByFixed
 from ..factors.const import FACTOR_NAME_DDAYS, FACTOR_NAME_LISTING_DAYS
+from ..factors.schema import FactorWeightRecord, FactorWeightResult
+
+
+class FactorStep(NamedTuple):
+    """计算计划中的一步, 加载因子时解析好调用方法和参数名"""
+    name: str
+    factor: Factor
+    get_weight: Callable[..., FactorWeightResult]
+    get_weight_record: Callable[..., FactorWeightRecord]
+    get_weight_batch: Callable[..., np.ndarray]
+    get_weight_exponent_batch: Callable[..., np.ndarray]
+    get_decimal_weight_batch: Callable[..., np.ndarray]
+    param_names: tuple[str, ...] | None  # None表示参数不固定, 按关键字参数调用
 
 
 class CPUCalculator:
     """CPU计算器"""
 
-    def __init__(self, config: CPUConfig, now: datetime | None = None):
-        """初始化CPU计算器"""
+    def __init__(self, config: CPUConfig, now: datetime | None = None, short_circuit: bool = False):
+        """
+        初始化CPU计算器
+
+        Args:
+            config: CPU配置
+            now: 当前时间
+            short_circuit: 是否短路计算, 开启后可能为0的固定值因子先计算, CPU为0后跳过剩余因子
+        """
         self.config = config
         self.now = now or datetime.now(timezone.utc)  # noqa: UP017
+        self.short_circuit = short_circuit
 
         self.factors: dict[str, Factor] = {}
+        self.priorities: dict[str, int] = {}
+        self.plan: tuple[FactorStep, ...] = ()
 
     def load_factors(self) -> None:
         """加载所有因子"""
@@ -27,10 +58,10 @@ class CPUCalculator:
                 }
                 impl_config = factor_config.config.model_dump() if factor_config.config else {}
                 factor = factor_config.implementation(**children_factors, **impl_config)
-                self.add_factor(factor)
+                self.add_factor(factor, factor_config.priority)
             else:
                 factor = self.load_factor(factor_config)
-                self.add_factor(factor)
+                self.add_factor(factor, factor_config.priority)
 
     def load_factor(self, factor_config: FactorConfig) -> Factor:
         """加载某个因子"""
@@ -47,14 +78,59 @@ class CPUCalculator:
         factor = factor_config.implementation(**impl_config)
         return factor
 
-    def add_factor(self, factor: Factor) -> None:
-        """添加一个因子至计算器"""
+    def add_factor(self, factor: Factor, priority: int = 0) -> None:
+        """添加一个因子至计算器, 优先级高的因子先计算, 相同优先级按添加顺序"""
         self.factors[factor.name] = factor
+        self.priorities[factor.name] = priority
+        self.compile_plan()
 
     def remove_factor(self, factor_name: str) -> None:
         """从计算器中移除一个因子"""
         if factor_name in self.factors:
             del self.factors[factor_name]
+            del self.priorities[factor_name]
+            self.compile_plan()
+
+    def advance_to(self, now: datetime) -> None:
+        """
+        将计算器的当前时间推进到now, 只更新与时间相关的因子(持有天数, 挂单天数), 其他因子不重新加载
+
+        Args:
+            now: 新的当前时间, 不能早于当前时间
+        """
+        if now < self.now:
+            raise ValueError(f"Can not advance to {now}, earlier than {self.now}")
+
+        self.now = now
+        for factor in self.factors.values():
+            if hasattr(factor, "advance_to"):
+                factor.advance_to(now)
+
+    def compile_plan(self) -> None:
+        """
+        将因子编译成不可变的计算计划
+        按优先级从高到低排序, 预先绑定get_weight/get_weight_batch方法和参数名, 计算时不再逐个解析
+        短路模式下可能为0的固定值因子排在最前面
+        """
+        def sort_key(factor_name: str) -> tuple[bool, int]:
+            factor = self.factors[factor_name]
+            is_zeroing = self.short_circuit and isinstance(factor, FactorByFixed) and factor.has_zero_weight
+            return not is_zeroing, -self.priorities[factor_name]
+
+        factor_names = sorted(self.factors, key=sort_key)
+        self.plan = tuple(
+            FactorStep(
+                name=factor_name,
+                factor=self.factors[factor_name],
+                get_weight=self.factors[factor_name].get_weight,
+                get_weight_record=self.factors[factor_name].get_weight_record,
+                get_weight_batch=self.factors[factor_name].get_weight_batch,
+                get_weight_exponent_batch=self.factors[factor_name].get_weight_exponent_batch,
+                get_decimal_weight_batch=self.factors[factor_name].get_decimal_weight_batch,
+                param_names=_get_param_names(self.factors[factor_name].get_weight),
+            )
+            for factor_name in factor_names
+        )
 
     def calculate(self, values: dict[str, dict]) -> CPUResult:
         """
@@ -66,23 +142,235 @@ class CPUCalculator:
         Returns:
             CPUResult: 包含最终CPU值和所有权重的结果
         """
-        result = CPUResult(cpu=self.config.base, factor_weights={})
+        return self.calculate_record(values).to_model()
 
-        for factor_name, factor in self.factors.items():
-            if factor_name not in values:
-                raise ValueError(f"Factor {factor_name} not in values")
+    def calculate_record(self, values: dict[str, dict]) -> CPURecord:
+        """
+        使用所有添加的因子计算CPU值, 返回不做校验的轻量结果, 需要序列化时调用to_model
 
-            params = values[factor_name]
-            if not isinstance(params, dict):
-                raise ValueError(f"Factor {factor_name} params must be a dict")
+        Args:
+            values: 因子值字典, 使用关键字参数
+
+        Returns:
+            CPURecord: 包含最终CPU值和所有权重的轻量结果
+        """
+        factor_weights = {}
+        cpu, skipped_factors = self._execute_plan(values, factor_weights)
+        return CPURecord(cpu, factor_weights, skipped_factors)
 
-            factor_weight_result = factor.get_weight(**params)
+    def calculate_cpu(self, values: dict[str, dict]) -> Decimal:
+        """
+        使用所有添加的因子计算CPU值, 只返回最终CPU值
 
-            result.factor_weights[factor_name] = factor_weight_result
-            result.cpu *= factor_weight_result.weight
+        Args:
+            values: 因子值字典, 使用关键字参数
+
+        Returns:
+            Decimal: 最终CPU值
+        """
+        return self._execute_plan(values)[0]
+
+    def _execute_plan(
+        self,
+        values: dict[str, dict],
+        factor_weights: dict[str, FactorWeightRecord] | None = None,
+    ) -> tuple[Decimal, list[str]]:
+        """按计划计算CPU值, 传入factor_weights时记录每个因子的权重, 返回CPU值和短路跳过的因子"""
+        cpu = Decimal(self.config.base)
+        skipped_factors = []
+
+        try:
+            for index, step in enumerate(self.plan):
+                params = values[step.name]
+                if step.param_names is None:
+                    factor_weight_record = step.get_weight_record(**params)
+                else:
+                    if len(params) != len(step.param_names):
+                        # 按位置取参数时多余的参数会被忽略, 参数个数不一致时检查输入并抛出异常
+                        self._check_values(values)
+                    factor_weight_record = step.get_weight_record(*[params[name] for name in step.param_names])
+
+                if factor_weights is not None:
+                    factor_weights[step.name] = factor_weight_record
+                cpu *= factor_weight_record.weight
+
+                if self.short_circuit and not cpu:
+                    skipped_factors = [skipped_step.name for skipped_step in self.plan[index + 1:]]
+                    break
+        except (KeyError, TypeError):
+            # 正常路径不做检查, 出错时再检查输入以给出明确的错误信息
+            self._check_values(values)
+            raise
+
+        return cpu, skipped_factors
+
+    def calculate_batch(
+        self,
+        values: dict[str, dict[str, Sequence]],
+        engine: str = CPU_ENGINE_DECIMAL,
+        verify_sample: int = 0,
+    ) -> CPUBatchResult:
+        """
+        使用所有添加的因子批量计算CPU值, 结果与逐个调用calculate一致
+
+        Args:
+            values: 因子值字典, 与calculate相同, 但每个参数是一列值(NumPy数组或序列), 所有列长度必须一致
+            engine: 乘积计算引擎, decimal使用Decimal逐个相乘, fixed_point将权重按精度缩放成整数后相乘, 最后统一缩放
+            verify_sample: 抽样行数, 大于0时将抽样行与calculate的结果逐一比较, 不一致则抛出异常
+
+        Returns:
+            CPUBatchResult: 包含CPU数组和所有权重数组的结果
+        """
+        if engine not in (CPU_ENGINE_DECIMAL, CPU_ENGINE_FIXED_POINT):
+            raise ValueError(f"Invalid engine: {engine}")
+
+        size = self._check_batch_values(values)
+        factor_weights = self._get_weights_batch(values, size)
+        factor_exponents = self._get_weight_exponents_batch(values, factor_weights)
+        # 短路跳过的行CPU已经为0, 乘积中按1处理
+        product_weights = [np.nan_to_num(weights, nan=1.0) for weights in factor_weights.values()]
+
+        if engine == CPU_ENGINE_FIXED_POINT:
+            scaled_weights = [
+                to_fixed_point(weights, exponents)
+                for weights, exponents in zip(product_weights, factor_exponents.values(), strict=True)
+            ]
+            products = multiply_fixed_point(self.config.base, scaled_weights, size)
+            # 基础值是整数, 乘积的小数位数是所有权重小数位数之和, 与Decimal逐个相乘一致
+            exponent = -sum(factor_exponents.values(), np.zeros(size, dtype=np.int64))
+            cpu = to_decimal(products, exponent)
+            if products.dtype == object:
+                # 超过Decimal精度的乘积在逐个相乘时会舍入, 这些行按Decimal重新计算
+                digits = getcontext().prec
+                for i in np.flatnonzero(np.abs(products) >= 10 ** digits).tolist():
+                    cpu[i] = self._multiply_decimal_row(i, product_weights, factor_exponents)
+            result = CPUBatchResult(
+                cpu=cpu,
+                factor_weights=factor_weights,
+                cpu_scaled=products,
+                cpu_exponent=exponent,
+            )
+        else:
+            cpu = np.full(size, Decimal(self.config.base), dtype=object)
+            for step, weights, exponents in zip(self.plan, product_weights, factor_exponents.values(), strict=True):
+                decimals = step.get_decimal_weight_batch(weights, exponents, **values[step.name])
+                decimals[np.isnan(factor_weights[step.name])] = Decimal(1)
+                cpu *= decimals
+            result = CPUBatchResult(cpu=cpu, factor_weights=factor_weights)
+
+        if verify_sample > 0:
+            self.verify_batch_result(values, result, verify_sample)
 
         return result
 
+    def _get_weights_batch(self, values: dict[str, dict[str, Sequence]], size: int) -> dict[str, np.ndarray]:
+        """按计划批量计算所有因子的权重, 短路模式下只计算CPU仍不为0的行"""
+        factor_weights = {}
+        rows = None  # CPU仍不为0的行下标, None表示所有行
+        for step in self.plan:
+            params = values[step.name]
+            if rows is None:
+                weights = step.get_weight_batch(**params)
+            else:
+                weights = np.full(size, np.nan)
+                if len(rows):
+                    weights[rows] = step.get_weight_batch(
+                        **{param_name: _take(column, rows) for param_name, column in params.items()}
+                    )
+            factor_weights[step.name] = weights
+
+            if self.short_circuit and (weights == 0).any():
+                rows = np.flatnonzero(np.nan_to_num(weights, nan=0.0))
+
+        return factor_weights
+
+    def _multiply_decimal_row(
+        self,
+        row: int,
+        product_weights: list[np.ndarray],
+        factor_exponents: dict[str, np.ndarray],
+    ) -> Decimal:
+        """按Decimal逐个相乘计算一行的CPU"""
+        cpu = Decimal(self.config.base)
+        for weights, exponents in zip(product_weights, factor_exponents.values(), strict=True):
+            cpu *= to_decimal_array(weights[row:row + 1], exponents[row:row + 1])[0]
+        return cpu
+
+    def _get_weight_exponents_batch(
+        self,
+        values: dict[str, dict[str, Sequence]],
+        factor_weights: dict[str, np.ndarray],
+    ) -> dict[str, np.ndarray]:
+        """批量获取所有因子权重的十进制指数, 短路跳过的行按权重1处理, 指数为0"""
+        factor_exponents = {}
+        for step in self.plan:
+            weights = factor_weights[step.name]
+            skipped = np.isnan(weights)
+            exponents = step.get_weight_exponent_batch(np.nan_to_num(weights, nan=1.0), **values[step.name])
+            exponents[skipped] = 0
+            factor_exponents[step.name] = exponents
+        return factor_exponents
+
+    def verify_batch_result(
+        self,
+        values: dict[str, dict[str, Sequence]],
+        result: CPUBatchResult,
+        sample: int,
+    ) -> None:
+        """
+        抽样比较批量计算结果与calculate的结果, 数值和小数位数都要一致
+
+        Args:
+            values: 批量计算使用的因子值字典
+            result: 批量计算结果
+            sample: 抽样行数, 均匀分布在所有行中
+
+        Raises:
+            ValueError: 抽样行的CPU值与calculate的结果不一致
+        """
+        size = len(result.cpu)
+        if not size:
+            return
+
+        for i in np.unique(np.linspace(0, size - 1, min(sample, size)).astype(np.int64)).tolist():
+            row = {
+                step.name: {
+                    param_name: _to_python(column[i])
+                    for param_name, column in values[step.name].items()
+                }
+                for step in self.plan
+            }
+            expected = self.calculate_cpu(row)
+            if result.cpu[i].as_tuple() != expected.as_tuple():
+                raise ValueError(f"Batch cpu {result.cpu[i]} != cpu {expected} at row {i}")
+
+    def _check_values(self, values: dict[str, dict]) -> None:
+        """检查因子值字典, 每个因子都要有参数字典, 参数名与get_weight一致"""
+        for step in self.plan:
+            if step.name not in values:
+                raise ValueError(f"Factor {step.name} not in values")
+
+            params = values[step.name]
+            if not isinstance(params, dict):
+                raise ValueError(f"Factor {step.name} params must be a dict")
+
+            if step.param_names is not None and set(params) != set(step.param_names):
+                raise ValueError(f"Factor {step.name} params {sorted(params)} != {sorted(step.param_names)}")
+
+    def _check_batch_values(self, values: dict[str, dict[str, Sequence]]) -> int:
+        """检查批量计算的因子值字典, 返回列长度"""
+        self._check_values(values)
+
+        size = None
+        for step in self.plan:
+            for param_name, column in values[step.name].items():
+                if size is None:
+                    size = len(column)
+                elif len(column) != size:
+                    raise ValueError(f"Factor {step.name} param {param_name} length {len(column)} != {size}")
+
+        return size or 0
+
     def calculate_with_given_result(self, result: dict[str, dict]) -> Decimal:
         """使用给定的结果重新计算"""
         cpu = Decimal(self.config.base)
@@ -90,3 +378,27 @@ class CPUCalculator:
             cpu *= Decimal(factor_weight_result["weight"])
 
         return cpu
+
+
+def _get_param_names(get_weight: Callable[..., FactorWeightResult]) -> tuple[str, ...] | None:
+    """获取get_weight的参数名, 参数不固定(有默认值或可变参数)时返回None"""
+    parameters = inspect.signature(get_weight).parameters.values()
+    if any(
+        parameter.default is not inspect.Parameter.empty
+        or parameter.kind not in (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD)
+        for parameter in parameters
+    ):
+        return None
+    return tuple(parameter.name for parameter in parameters)
+
+
+def _take(column: Sequence, rows: np.ndarray) -> Sequence:
+    """取出一列中指定下标的值"""
+    if isinstance(column, np.ndarray):
+        return column[rows]
+    return [column[i] for i in rows.tolist()]
+
+
+def _to_python(value):
+    """将numpy标量转成python对象"""
+    return value.item() if isinstance(value, np.generic) else value
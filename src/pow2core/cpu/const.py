@@ -0,0 +1,6 @@
+# CPU乘积计算引擎
+CPU_ENGINE_DECIMAL = "decimal"  # Decimal逐个相乘
+CPU_ENGINE_FIXED_POINT = "fixed_point"  # 定点数整数相乘
+
+# 并行计算时每个任务的默认行数, 足够大以摊薄进程间通信的开销
+DEFAULT_CHUNK_SIZE = 1000
@@ -0,0 +1,85 @@
+from collections.abc import Iterable
+from decimal import Decimal
+
+import numpy as np
+
+from ..factors.algorithms.base import MAX_DECIMAL_DIGITS
+
+# int64乘积的安全上限, 用float64估算乘积时留出舍入误差的余量
+INT64_SAFE_LIMIT = 2.0 ** 62
+
+
+def to_fixed_point(weights: np.ndarray, exponents: np.ndarray) -> np.ndarray:
+    """
+    按每行的十进制指数将量化后的float64权重数组转成定点数
+
+    Args:
+        weights: 权重数组
+        exponents: 每行权重的十进制指数, 即因子get_weight_exponent_batch的结果
+
+    Returns:
+        np.ndarray: int64数组scaled, 满足Decimal(weight) == Decimal(scaled).scaleb(exponent), 包括小数位数
+    """
+    scaled = weights * 10.0 ** -exponents
+    # 有效数字超过float64能精确表示的位数时, 缩放后的整数可能有误差
+    if (np.abs(scaled) >= 10.0 ** MAX_DECIMAL_DIGITS).any():
+        raise ValueError("Weights can not be represented as fixed point numbers")
+
+    return np.rint(scaled).astype(np.int64)
+
+
+def multiply_fixed_point(base: int, weights: Iterable[np.ndarray], size: int) -> np.ndarray:
+    """
+    在整数空间中计算base与所有定点数权重的乘积
+
+    Args:
+        base: 基础值
+        weights: 每个因子的定点数权重数组
+        size: 数组长度
+
+    Returns:
+        np.ndarray: 乘积, 十进制指数是所有权重指数之和;
+            乘积未溢出int64时是int64数组, 否则是python int的object数组
+    """
+    weights = list(weights)
+    products = np.full(size, base, dtype=np.int64)
+    magnitudes = np.full(size, abs(float(base)))
+    for factor_scaled in weights:
+        # int64溢出后回绕, 溢出的行之后用python int重新计算
+        products *= factor_scaled
+        magnitudes *= np.abs(factor_scaled)
+
+    overflow = magnitudes >= INT64_SAFE_LIMIT
+    if overflow.any():
+        exact = np.full(int(overflow.sum()), base, dtype=object)
+        for factor_scaled in weights:
+            exact *= factor_scaled[overflow].astype(object)
+
+        products = products.astype(object)
+        products[overflow] = exact
+
+    return products
+
+
+def to_decimal(products: np.ndarray, exponents: np.ndarray) -> np.ndarray:
+    """
+    将定点数乘积按每行的小数位数转成Decimal数组, Decimal(product).scaleb(-exponent)
+
+    相同的(乘积, 小数位数)只构造一次Decimal, 再按行展开
+    """
+    if products.dtype == object:
+        decimals = np.empty(len(products), dtype=object)
+        decimals[:] = [
+            Decimal(product).scaleb(-exponent)
+            for product, exponent in zip(products.tolist(), exponents.tolist(), strict=True)
+        ]
+        return decimals
+
+    decimals = np.empty(len(products), dtype=object)
+    for exponent in np.unique(exponents).tolist():
+        mask = exponents == exponent
+        unique_products, inverse = np.unique(products[mask], return_inverse=True)
+        unique_decimals = np.empty(len(unique_products), dtype=object)
+        unique_decimals[:] = [Decimal(product).scaleb(-exponent) for product in unique_products.tolist()]
+        decimals[mask] = unique_decimals[inverse]
+    return decimals
@@ -0,0 +1,131 @@
+import os
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from decimal import Decimal
+from itertools import islice
+
+from .calculator import CPUCalculator
+from .const import DEFAULT_CHUNK_SIZE
+from .schema import CPURecord
+from ..config.schema import CPUConfig
+
+# 每个工作进程中的计算器, 由_init_worker创建, 进程内所有任务共用
+_calculator: CPUCalculator | None = None
+
+
+class ParallelCPUCalculator:
+    """
+    多进程CPU计算器
+    每个工作进程启动时按CPUConfig加载一次因子(包括归一化权重表和alpha查找), 之后按块计算, 结果按输入顺序返回
+    """
+
+    def __init__(
+        self,
+        config: CPUConfig,
+        now: datetime | None = None,
+        workers: int | None = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        short_circuit: bool = False,
+        setup: Callable[[CPUCalculator], None] | None = None,
+    ):
+        """
+        初始化多进程CPU计算器
+
+        Args:
+            config: CPU配置
+            now: 当前时间, 所有工作进程使用同一个时间
+            workers: 工作进程数, 默认为CPU核数
+            chunk_size: 每个任务的行数
+            short_circuit: 是否短路计算, 同CPUCalculator
+            setup: 工作进程加载因子之后调用, 用于加载数据, 如交易量的load_weights, 卡槽的load_tokens_with_slot;
+                需要可以被pickle, 即模块级函数或functools.partial
+        """
+        if chunk_size <= 0:
+            raise ValueError(f"Invalid chunk size: {chunk_size}")
+
+        self.config = config
+        self.now = now or datetime.now(timezone.utc)  # noqa: UP017
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.short_circuit = short_circuit
+        self.setup = setup
+
+        self._executor: ProcessPoolExecutor | None = None
+
+    def __enter__(self) -> "ParallelCPUCalculator":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        """进程池, 第一次使用时创建, 之后的计算复用已经加载好因子的工作进程"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.config, self.now, self.short_circuit, self.setup),
+            )
+        return self._executor
+
+    def close(self) -> None:
+        """关闭进程池"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def calculate_records(self, values: Iterable[dict[str, dict]]) -> list[CPURecord]:
+        """
+        并行计算CPU值
+
+        Args:
+            values: 每个token的因子值字典, 与CPUCalculator.calculate相同
+
+        Returns:
+            list[CPURecord]: 按输入顺序排列的轻量结果
+        """
+        return [record for records in self.executor.map(_calculate_records, self._chunks(values)) for record in records]
+
+    def calculate_cpus(self, values: Iterable[dict[str, dict]]) -> list[Decimal]:
+        """
+        并行计算CPU值, 只返回最终CPU值
+
+        Args:
+            values: 每个token的因子值字典, 与CPUCalculator.calculate相同
+
+        Returns:
+            list[Decimal]: 按输入顺序排列的CPU值
+        """
+        return [cpu for cpus in self.executor.map(_calculate_cpus, self._chunks(values)) for cpu in cpus]
+
+    def _chunks(self, values: Iterable[dict[str, dict]]) -> Iterator[list[dict[str, dict]]]:
+        """按chunk_size切分输入"""
+        iterator = iter(values)
+        while chunk := list(islice(iterator, self.chunk_size)):
+            yield chunk
+
+
+def _init_worker(
+    config: CPUConfig,
+    now: datetime,
+    short_circuit: bool,
+    setup: Callable[[CPUCalculator], None] | None,
+) -> None:
+    """工作进程初始化, 加载因子"""
+    global _calculator  # noqa: PLW0603
+    _calculator = CPUCalculator(config, now=now, short_circuit=short_circuit)
+    _calculator.load_factors()
+    if setup is not None:
+        setup(_calculator)
+
+
+def _calculate_records(values: list[dict[str, dict]]) -> list[CPURecord]:
+    """在工作进程中计算一块数据"""
+    return [_calculator.calculate_record(value) for value in values]
+
+
+def _calculate_cpus(values: list[dict[str, dict]]) -> list[Decimal]:
+    """在工作进程中计算一块数据, 只返回CPU值"""
+    return [_calculator.calculate_cpu(value) for value in values]
@@ -1,11 +1,41 @@
+from dataclasses import dataclass
 from decimal import Decimal
 
-from pydantic import BaseModel, Field
+import numpy as np
+from pydantic import BaseModel, ConfigDict, Field
 
-from ..factors.schema import FactorWeightResult
+from ..factors.schema import FactorWeightRecord, FactorWeightResult
 
 
 class CPUResult(BaseModel):
     """CPU计算结果"""
     cpu: Decimal = Field(description="最终CPU值")
     factor_weights: dict[str, FactorWeightResult] = Field(description="所有权重")
+    skipped_factors: list[str] = Field(default_factory=list, description="短路模式下CPU已经为0而跳过的因子")
+
+
+
+@dataclass(slots=True)
+class CPURecord:
+    """轻量的CPU计算结果, 不做校验, 需要序列化时用to_model转成CPUResult"""
+    cpu: Decimal
+    factor_weights: dict[str, FactorWeightRecord]
+    skipped_factors: list[str]
+
+    def to_model(self) -> CPUResult:
+        """转成CPUResult"""
+        return CPUResult(
+            cpu=self.cpu,
+            factor_weights={name: record.to_model() for name, record in self.factor_weights.items()},
+            skipped_factors=self.skipped_factors,
+        )
+
+
+class CPUBatchResult(BaseModel):
+    """批量CPU计算结果, 数组的下标对应输入的行"""
+    cpu: np.ndarray = Field(description="最终CPU值数组, 元素为Decimal")
+    factor_weights: dict[str, np.ndarray] = Field(description="所有权重数组, 元素为float64, 短路模式下跳过的行为NaN")
+    cpu_scaled: np.ndarray | None = Field(default=None, description="定点数引擎中缩放后的CPU整数数组")
+    cpu_exponent: np.ndarray | None = Field(default=None, description="定点数引擎中每行CPU的小数位数, cpu = cpu_scaled / 10**cpu_exponent")
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
@@ -0,0 +1,116 @@
+import copy
+import io
+import mmap
+import pickle
+import struct
+from pathlib import Path
+
+import numpy as np
+
+from .calculator import CPUCalculator
+from ..factors.algorithms.normalize import FactorByNormalize
+from ..factors.const import NORMALIZE_STORAGE_ARRAY
+
+# 快照文件头: 魔数, 版本, pickle数据长度
+SNAPSHOT_MAGIC = b"POW2SNAP"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = struct.Struct("<8sIQ")
+# 数组数据按64字节对齐, 便于直接映射成数组
+SNAPSHOT_ALIGNMENT = 64
+
+
+def save_snapshot(calculator: CPUCalculator, path: str | Path) -> None:
+    """
+    保存已经加载好因子的CPU计算器快照
+    计算器对象(配置, 因子, alpha, tokens_with_slot等)用pickle序列化,
+    其中的NumPy数组(权重表等)不进入pickle, 按原始字节对齐写在文件末尾, 加载时直接内存映射
+    dict存储的归一化因子在快照中转成array存储(查询结果不变), 避免每个进程各自反序列化一份字典, 传入的计算器不变
+
+    Args:
+        calculator: 已经加载好因子的CPU计算器
+        path: 快照文件路径
+    """
+    arrays: list[np.ndarray] = []
+    offsets: list[int] = []
+    data_size = 0
+
+    class SnapshotPickler(pickle.Pickler):
+        def persistent_id(self, obj):
+            nonlocal data_size
+            if not isinstance(obj, np.ndarray) or obj.dtype.hasobject:
+                return None
+
+            array = np.ascontiguousarray(obj)
+            data_size = _align(data_size)
+            arrays.append(array)
+            offsets.append(data_size)
+            reference = ("ndarray", data_size, array.dtype.str, array.shape)
+            data_size += array.nbytes
+            return reference
+
+        def reducer_override(self, obj):
+            if not isinstance(obj, FactorByNormalize) or obj.analytic or obj.storage == NORMALIZE_STORAGE_ARRAY:
+                return NotImplemented
+
+            # 在浅拷贝上转换存储方式, to_array_storage只重新绑定属性, 不修改原因子
+            converted = copy.copy(obj)
+            converted.to_array_storage()
+            return converted.__reduce_ex__(pickle.HIGHEST_PROTOCOL)
+
+    buffer = io.BytesIO()
+    SnapshotPickler(buffer, protocol=pickle.HIGHEST_PROTOCOL).dump(calculator)
+    payload = buffer.getvalue()
+
+    with open(path, "wb") as f:
+        f.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(payload)))
+        f.write(payload)
+
+        data_start = _align(SNAPSHOT_HEADER.size + len(payload))
+        for array, offset in zip(arrays, offsets, strict=True):
+            f.write(b"\0" * (data_start + offset - f.tell()))
+            f.write(array.tobytes())
+
+
+def load_snapshot(path: str | Path) -> CPUCalculator:
+    """
+    加载CPU计算器快照, 不重新解析配置和加载因子
+    数组以只读方式映射到文件, 多个进程加载同一个快照时共享内存页
+    快照包含pickle数据, 只能加载可信的文件
+
+    Args:
+        path: 快照文件路径
+
+    Returns:
+        CPUCalculator: 与保存时状态一致的CPU计算器
+    """
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, version, payload_size = SNAPSHOT_HEADER.unpack_from(buffer)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError(f"Invalid snapshot file: {path}")
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"Unsupported snapshot version: {version}")
+
+    payload = memoryview(buffer)[SNAPSHOT_HEADER.size:SNAPSHOT_HEADER.size + payload_size]
+    data_start = _align(SNAPSHOT_HEADER.size + payload_size)
+
+    class SnapshotUnpickler(pickle.Unpickler):
+        def persistent_load(self, pid):
+            kind, offset, dtype, shape = pid
+            if kind != "ndarray":
+                raise pickle.UnpicklingError(f"Unknown persistent id: {kind}")
+
+            dtype = np.dtype(dtype)
+            if not int(np.prod(shape, dtype=np.int64)):
+                return np.empty(shape, dtype=dtype)
+            return np.memmap(path, dtype=dtype, mode="r", offset=data_start + offset, shape=shape)
+
+    calculator = SnapshotUnpickler(io.BytesIO(payload)).load()
+    payload.release()
+    return calculator
+
+
+def _align(size: int) -> int:
+    """向上对齐到SNAPSHOT_ALIGNMENT"""
+    return -(-size // SNAPSHOT_ALIGNMENT) * SNAPSHOT_ALIGNMENT
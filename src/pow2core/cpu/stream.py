@@ -0,0 +1,108 @@
+from collections.abc import Callable, Iterable, Iterator
+from decimal import Decimal
+from itertools import islice
+
+from .calculator import CPUCalculator
+from .const import CPU_ENGINE_DECIMAL, DEFAULT_CHUNK_SIZE
+from .schema import CPUBatchResult, CPURecord
+
+
+class StreamingCPUCalculator:
+    """
+    流式CPU计算器
+    从迭代器中按块读取每个token的因子值, 计算完一块再读取下一块, 内存占用只与块大小有关, 与总行数无关
+    """
+
+    def __init__(
+        self,
+        calculator: CPUCalculator,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        engine: str = CPU_ENGINE_DECIMAL,
+    ):
+        """
+        初始化流式CPU计算器
+
+        Args:
+            calculator: 已经加载好因子的CPU计算器
+            chunk_size: 每块的行数
+            engine: 批量计算的乘积引擎, 同CPUCalculator.calculate_batch
+        """
+        if chunk_size <= 0:
+            raise ValueError(f"Invalid chunk size: {chunk_size}")
+
+        self.calculator = calculator
+        self.chunk_size = chunk_size
+        self.engine = engine
+
+    def iter_chunks(self, values: Iterable[dict[str, dict]]) -> Iterator[CPUBatchResult]:
+        """
+        按块批量计算, 每块转成列后调用calculate_batch
+
+        Args:
+            values: 每个token的因子值字典, 与CPUCalculator.calculate相同
+
+        Yields:
+            CPUBatchResult: 每块的批量计算结果
+        """
+        for chunk in self._chunks(values):
+            yield self.calculator.calculate_batch(to_columns(chunk), engine=self.engine)
+
+    def iter_cpus(self, values: Iterable[dict[str, dict]]) -> Iterator[Decimal]:
+        """
+        按块批量计算, 逐个返回CPU值
+
+        Args:
+            values: 每个token的因子值字典
+
+        Yields:
+            Decimal: 按输入顺序的CPU值
+        """
+        for result in self.iter_chunks(values):
+            yield from result.cpu.tolist()
+
+    def iter_records(self, values: Iterable[dict[str, dict]]) -> Iterator[CPURecord]:
+        """
+        逐个计算并返回轻量结果, 包含每个因子的值和权重
+
+        Args:
+            values: 每个token的因子值字典
+
+        Yields:
+            CPURecord: 按输入顺序的轻量结果
+        """
+        for value in values:
+            yield self.calculator.calculate_record(value)
+
+    def write(self, values: Iterable[dict[str, dict]], sink: Callable[[CPUBatchResult], None]) -> int:
+        """
+        按块计算并写入sink, 如写文件或数据库, 不保留任何结果
+
+        Args:
+            values: 每个token的因子值字典
+            sink: 接收每块批量计算结果的函数
+
+        Returns:
+            int: 写入的总行数
+        """
+        total = 0
+        for result in self.iter_chunks(values):
+            sink(result)
+            total += len(result.cpu)
+        return total
+
+    def _chunks(self, values: Iterable[dict[str, dict]]) -> Iterator[list[dict[str, dict]]]:
+        """按chunk_size切分输入"""
+        iterator = iter(values)
+        while chunk := list(islice(iterator, self.chunk_size)):
+            yield chunk
+
+
+def to_columns(rows: list[dict[str, dict]]) -> dict[str, dict[str, list]]:
+    """将每行的因子值字典转成calculate_batch使用的列, 参数名以第一行为准"""
+    return {
+        factor_name: {
+            param_name: [row[factor_name][param_name] for row in rows]
+            for param_name in params
+        }
+        for factor_name, params in rows[0].items()
+    }
@@ -1,3 +1,6 @@
 # 分配策略
 DISTRIBUTE_STRATEGY_FIXED_GROUP = "fixed_group"  # 固定组
 DISTRIBUTE_STRATEGY_LEVEL_GROUP = "level_group"  # 等级组
+
+# 等级组策略按总人数缓存的分组布局数量
+DEFAULT_LAYOUT_CACHE_SIZE = 128
@@ -1,3 +1,11 @@
+from bisect import bisect_right
+from itertools import accumulate
+
+import numpy as np
+
+from .schema import DistributionRun
+
+
 class FixedGroupStrategy:
     """
     按固定人数组和钻石组分配钻石
@@ -20,6 +28,10 @@ class FixedGroupStrategy:
 
         self.user_groups = user_groups
         self.diamond_groups = diamond_groups
+        # 每组结束排名(不含)的累计边界, 排名所在组为第一个大于排名的边界
+        self.boundaries = list(accumulate(user_groups))
+        self._boundary_array = np.asarray(self.boundaries, dtype=np.int64)
+        self._diamond_array = np.asarray(diamond_groups, dtype=np.int64)
 
     def get_all_distributions(
         self,
@@ -37,26 +49,66 @@ class FixedGroupStrategy:
         Returns:
             list[int]: 钻石数量列表, 索引是排名, 从0开始
         """
-        max_total_user = sum(self.user_groups)
+        return self.get_all_distribution_array(total_users, strict=strict).tolist()
+
+    def get_all_distribution_array(
+        self,
+        total_users: int,
+        strict: bool = False,
+    ) -> np.ndarray:
+        """
+        按照排名给所有用户分配钻石, 按截断后的每组人数重复每组的钻石数
+
+        Args:
+            total_users: 总人数
+            strict: 是否严格模式, 严格模式下预设人数和总人数必须一致
+
+        Returns:
+            np.ndarray: 钻石数量数组, 索引是排名, 从0开始
+        """
+        starts, ends = self._get_group_ranges(total_users, strict)
+        return np.repeat(self._diamond_array, ends - starts)
+
+    def get_distribution_runs(
+        self,
+        total_users: int,
+        strict: bool = False,
+    ) -> list[DistributionRun]:
+        """
+        按照排名给所有用户分配钻石, 返回游程编码, 不展开每个排名
+
+        Args:
+            total_users: 总人数
+            strict: 是否严格模式, 严格模式下预设人数和总人数必须一致
+
+        Returns:
+            list[DistributionRun]: (开始排名, 结束排名(不含), 钻石数) 列表, 跳过没有人的组
+        """
+        starts, ends = self._get_group_ranges(total_users, strict)
+        return [
+            DistributionRun(start, end, diamond)
+            for start, end, diamond in zip(starts.tolist(), ends.tolist(), self.diamond_groups, strict=True)
+            if end > start
+        ]
+
+    def _get_group_ranges(self, total_users: int, strict: bool) -> tuple[np.ndarray, np.ndarray]:
+        """
+        获取按总人数截断后每组的开始排名和结束排名(不含)
+
+        Raises:
+            ValueError: 总人数超过预设人数
+            ValueError: 严格模式下预设人数和总人数不一致
+        """
+        max_total_user = self.boundaries[-1]
         if total_users > max_total_user:
             raise ValueError(f"总人数{total_users}超过预设人数{max_total_user}")
 
         if strict and max_total_user != total_users:
                 raise ValueError("预设人数和总人数不一致")
 
-        distributions = [0] * total_users
-        start_ranking = 0
-
-        for group_idx, user_group_size in enumerate(self.user_groups):
-            end_ranking = min(start_ranking + user_group_size, total_users)
-            for i in range(start_ranking, end_ranking):
-                distributions[i] = self.diamond_groups[group_idx]
-            start_ranking = end_ranking
-
-            if start_ranking >= total_users:
-                break
-
-        return distributions
+        ends = np.minimum(self._boundary_array, total_users)
+        starts = np.concatenate(([0], ends[:-1]))
+        return starts, ends
 
     def get_distributions_by_some_rankings(
         self,
@@ -71,28 +123,66 @@ class FixedGroupStrategy:
         Returns:
             dict[int, int]: 排名到钻石数量的映射
         """
-        rankings = set(rankings)  # 去重
-        max_total_user = sum(self.user_groups)
-        if len(rankings) > max_total_user:
-            raise ValueError("排行榜长度超过预设人数")
+        rankings = np.unique(np.asarray(rankings, dtype=np.int64))  # 去重
+        diamonds = self.get_distribution_array_by_rankings(rankings)
+        return dict(zip(rankings.tolist(), diamonds.tolist(), strict=True))
 
-        result = {}
-        start_ranking = 0
+    def get_distribution_array_by_rankings(
+        self,
+        rankings: list[int] | np.ndarray,
+    ) -> np.ndarray:
+        """
+        获取一部分排名的钻石分配, 用累计边界二分查找排名所在组
 
-        for group_idx, user_group_size in enumerate(self.user_groups):
-            end_ranking = start_ranking + user_group_size
-            diamond = self.diamond_groups[group_idx]
+        Args:
+            rankings: 排行榜, 元素是排名, 排名是从0开始的
 
-            for ranking in rankings:
-                if ranking < 0:
-                    raise ValueError(f"无效排名:{ranking},排名不能为负数")
+        Returns:
+            np.ndarray: 钻石数量数组, 与排名一一对应
+        """
+        rankings = np.asarray(rankings, dtype=np.int64)
+        self._check_rankings(rankings)
+        group_indexes = np.searchsorted(self._boundary_array, rankings, side="right")
+        return self._diamond_array[group_indexes]
 
-                if ranking >= max_total_user:
-                    raise ValueError(f"无效排名:{ranking}超过预设最大人数{max_total_user}")
+    def get_distribution_by_ranking(self, ranking: int) -> int:
+        """
+        获取一个排名的钻石分配
 
-                if start_ranking <= ranking < end_ranking:
-                    result[ranking] = diamond
+        Args:
+            ranking: 排名, 从0开始
+
+        Returns:
+            int: 钻石数量
+        """
+        max_total_user = self.boundaries[-1]
+        if ranking < 0:
+            raise ValueError(f"无效排名:{ranking},排名不能为负数")
+
+        if ranking >= max_total_user:
+            raise ValueError(f"无效排名:{ranking}超过预设最大人数{max_total_user}")
+
+        return self.diamond_groups[bisect_right(self.boundaries, ranking)]
+
+    def _check_rankings(self, rankings: np.ndarray) -> None:
+        """
+        检查排名
+
+        Raises:
+            ValueError: 排行榜长度超过预设人数
+            ValueError: 无效排名
+        """
+        if not len(rankings):
+            return
+
+        max_total_user = self.boundaries[-1]
+        if len(rankings) > max_total_user and len(np.unique(rankings)) > max_total_user:
+            raise ValueError("排行榜长度超过预设人数")
 
-            start_ranking = end_ranking
+        min_ranking = int(rankings.min())
+        if min_ranking < 0:
+            raise ValueError(f"无效排名:{min_ranking},排名不能为负数")
 
-        return result
+        max_ranking = int(rankings.max())
+        if max_ranking >= max_total_user:
+            raise ValueError(f"无效排名:{max_ranking}超过预设最大人数{max_total_user}")
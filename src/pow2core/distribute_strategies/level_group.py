@@ -1,5 +1,11 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from .const import DEFAULT_LAYOUT_CACHE_SIZE
 from .fixed_group import FixedGroupStrategy
-from .schema import LevelGroupThresholdItem
+from .schema import DistributionRun, GroupLayoutCacheInfo, LevelGroupThresholdItem
 
 
 class LevelGroupStrategy:
@@ -14,19 +20,83 @@ class LevelGroupStrategy:
         group_ratios: list[float],
         base_diamond_groups: list[int],
         level_thresholds: list[LevelGroupThresholdItem],
+        cache_size: int = DEFAULT_LAYOUT_CACHE_SIZE,
     ) -> None:
         """
         Args:
             group_ratios: 每组人数占总人数的百分比
             base_diamond_groups: 每组中每人对应的钻石数的基础值
             level_thresholds: 每个等级的阈值, {level: 1, users: 50, diamonds: 2500}
+            cache_size: 按总人数缓存的分组布局数量上限, 超过后淘汰最久没有使用的, 0表示不缓存
         """
+        if cache_size < 0:
+            raise ValueError(f"缓存数量不能为负数: {cache_size}")
+
         if sum(group_ratios) != 1:
             raise ValueError("每组人数占总人数的百分比之和必须为1")
 
         self.group_ratios = group_ratios
         self.base_diamond_groups = base_diamond_groups
         self.level_thresholds = sorted(level_thresholds, key=lambda x: x.level, reverse=True)
+        self.cache_size = cache_size
+        self._layouts: OrderedDict[int, FixedGroupStrategy] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        # 保护缓存和统计, API处理函数可能在多个线程中并发调用
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def get_layout(self, total_users: int) -> FixedGroupStrategy:
+        """
+        获取总人数对应的分组布局, 包括每组人数、每组钻石数和累计边界, 按总人数LRU缓存
+        缓存的读写在锁内进行, 未命中时在锁外计算布局, 并发未命中同一人数时可能重复计算, 结果相同
+
+        Args:
+            total_users: 总人数
+
+        Returns:
+            FixedGroupStrategy: 固定组策略
+        """
+        with self._lock:
+            layout = self._layouts.get(total_users)
+            if layout is not None:
+                self._hits += 1
+                self._layouts.move_to_end(total_users)
+                return layout
+            self._misses += 1
+
+        user_groups, diamond_groups = self.get_user_and_diamond_groups(total_users=total_users)
+        layout = FixedGroupStrategy(
+            user_groups=user_groups,
+            diamond_groups=diamond_groups,
+        )
+        if self.cache_size:
+            with self._lock:
+                self._layouts[total_users] = layout
+                self._layouts.move_to_end(total_users)
+                if len(self._layouts) > self.cache_size:
+                    self._layouts.popitem(last=False)
+        return layout
+
+    def cache_info(self) -> GroupLayoutCacheInfo:
+        """获取分组布局缓存的统计"""
+        with self._lock:
+            return GroupLayoutCacheInfo(self._hits, self._misses, self.cache_size, len(self._layouts))
+
+    def cache_clear(self) -> None:
+        """清空分组布局缓存和统计"""
+        with self._lock:
+            self._layouts.clear()
+            self._hits = 0
+            self._misses = 0
 
     def get_all_distributions(
         self,
@@ -41,12 +111,31 @@ class LevelGroupStrategy:
         Returns:
             list[int]: 钻石数量列表, 索引是排名, 从0开始
         """
-        user_groups, diamond_groups = self.get_user_and_diamond_groups(total_users=total_users)
+        return self.get_layout(total_users).get_all_distributions(total_users=total_users)
 
-        return FixedGroupStrategy(
-            user_groups=user_groups,
-            diamond_groups=diamond_groups,
-        ).get_all_distributions(total_users=total_users)
+    def get_all_distribution_array(self, total_users: int) -> np.ndarray:
+        """
+        获取所有用户的钻石分配
+
+        Args:
+            total_users: 总人数
+
+        Returns:
+            np.ndarray: 钻石数量数组, 索引是排名, 从0开始
+        """
+        return self.get_layout(total_users).get_all_distribution_array(total_users=total_users)
+
+    def get_distribution_runs(self, total_users: int) -> list[DistributionRun]:
+        """
+        获取所有用户的钻石分配的游程编码
+
+        Args:
+            total_users: 总人数
+
+        Returns:
+            list[DistributionRun]: (开始排名, 结束排名(不含), 钻石数) 列表
+        """
+        return self.get_layout(total_users).get_distribution_runs(total_users=total_users)
 
     def get_distributions_by_some_rankings(
         self,
@@ -63,11 +152,37 @@ class LevelGroupStrategy:
         Returns:
             dict[int, int]: 排名到钻石数量的映射
         """
-        user_groups, diamond_groups = self.get_user_and_diamond_groups(total_users=total_users)
-        return FixedGroupStrategy(
-            user_groups=user_groups,
-            diamond_groups=diamond_groups,
-        ).get_distributions_by_some_rankings(rankings=rankings)
+        return self.get_layout(total_users).get_distributions_by_some_rankings(rankings=rankings)
+
+    def get_distribution_array_by_rankings(
+        self,
+        total_users: int,
+        rankings: list[int] | np.ndarray,
+    ) -> np.ndarray:
+        """
+        获取一部分排名的钻石分配
+
+        Args:
+            total_users: 总人数
+            rankings: 排行榜, 元素是排名, 排名是从0开始的
+
+        Returns:
+            np.ndarray: 钻石数量数组, 与排名一一对应
+        """
+        return self.get_layout(total_users).get_distribution_array_by_rankings(rankings=rankings)
+
+    def get_distribution_by_ranking(self, total_users: int, ranking: int) -> int:
+        """
+        获取一个排名的钻石分配
+
+        Args:
+            total_users: 总人数
+            ranking: 排名, 从0开始
+
+        Returns:
+            int: 钻石数量
+        """
+        return self.get_layout(total_users).get_distribution_by_ranking(ranking)
 
     def get_user_and_diamond_groups(self, total_users: int) -> tuple[list[int], list[int]]:
         """
@@ -1,4 +1,5 @@
 from decimal import Decimal
+from typing import NamedTuple
 
 from pydantic import BaseModel, Field
 
@@ -22,3 +23,18 @@ class LevelGroupStrategyConfig(BaseModel):
     thresholds: list[LevelGroupThresholdItem] = Field(description="等级阈值列表")
     group_ratios: list[Decimal] = Field(description="组比例列表")
     base_group_diamonds: list[int] = Field(description="基础组钻石数量列表")
+
+
+class DistributionRun(NamedTuple):
+    """钻石分配的游程, 排名在[start_ranking, end_ranking)内的用户都分配diamonds个钻石"""
+    start_ranking: int
+    end_ranking: int
+    diamonds: int
+
+
+class GroupLayoutCacheInfo(NamedTuple):
+    """分组布局缓存的统计"""
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
@@ -5,10 +5,19 @@ This module provides different types of factor calculation algorithms.
 """
 
 from abc import ABC
+from collections.abc import Callable, Sequence
 from decimal import Decimal
+from functools import cache
 from typing import Protocol
 
-from ..schema import FactorWeightResult
+import numpy as np
+
+from ..schema import FactorWeightRecord, FactorWeightResult
+
+# Scaled weights closer than this to x.5 may round differently in binary and decimal
+QUANTIZE_TIE_TOLERANCE = 1e-6
+# float64 holds at most 15 significant decimal digits exactly
+MAX_DECIMAL_DIGITS = 15
 
 
 class Factor(Protocol):
@@ -27,6 +36,73 @@ class Factor(Protocol):
         """Get weight of factor for the given value"""
         ...
 
+    def get_weight_record(self, value: int | float | Decimal) -> FactorWeightRecord:
+        """Get weight of factor for the given value as a lightweight record"""
+        ...
+
+    def get_weight_batch(self, **columns: Sequence) -> np.ndarray:
+        """Get weights of factor for the given columns of values"""
+        ...
+
+    def get_weight_exponent_batch(self, weights: np.ndarray, **columns: Sequence) -> np.ndarray:
+        """Get the decimal exponents of the weights returned by get_weight_batch"""
+        ...
+
+    def get_decimal_weight_batch(self, weights: np.ndarray, exponents: np.ndarray, **columns: Sequence) -> np.ndarray:
+        """Get the Decimal weights of get_weight for the given columns of values"""
+        ...
+
+
+def get_weight_batch_by_rows(
+    get_weight: Callable[..., FactorWeightResult],
+    columns: dict[str, Sequence],
+) -> np.ndarray:
+    """
+    Get float64 weights by calling get_weight row by row.
+    Identical rows are only evaluated once, which suits low cardinality columns.
+
+    Args:
+        get_weight: scalar weight function
+        columns: parameter name to a column of values, all of the same length
+
+    Returns:
+        np.ndarray: weights with the same length as the columns
+    """
+    names = list(columns)
+    # numpy scalars fail checks like isinstance(value, int), use python objects instead
+    lists = [column.tolist() if isinstance(column, np.ndarray) else column for column in columns.values()]
+    size = len(lists[0]) if lists else 0
+    weights = np.empty(size, dtype=np.float64)
+
+    cache: dict[tuple, float] = {}
+    for i, row in enumerate(zip(*lists, strict=True)):
+        weight = cache.get(row)
+        if weight is None:
+            weight = float(get_weight(**dict(zip(names, row, strict=True))).weight)
+            cache[row] = weight
+        weights[i] = weight
+
+    return weights
+
+
+def gather_by_sorted_keys(
+    keys: np.ndarray,
+    table: np.ndarray,
+    values: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Look up values in ascending keys and gather the parallel table.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: gathered table values and the mask of found values
+    """
+    if not len(keys):
+        return np.zeros(len(values), dtype=table.dtype), np.zeros(len(values), dtype=bool)
+
+    index = np.searchsorted(keys, values).clip(max=len(keys) - 1)
+    found = keys[index] == values
+    return table[index], found
+
 
 class BaseFactor(ABC):  # noqa: B024
     """Base class for weight factors"""
@@ -46,10 +122,118 @@ class BaseFactor(ABC):  # noqa: B024
         self.is_visible = is_visible
         self.kwargs = kwargs
 
-    def get_weight(self, value: int | float | Decimal) -> FactorWeightResult:  # noqa: B027
+    def get_weight(self, value: int | float | Decimal) -> FactorWeightResult:
         """Get weight of factor for the given value"""
+        return self._get_weight_record(value).to_model()
+
+    def get_weight_record(self, value: int | float | Decimal) -> FactorWeightRecord:
+        """Get weight of factor for the given value as a lightweight record, skipping model validation"""
+        return self._get_weight_record(value)
+
+    def _get_weight_record(self, value: int | float | Decimal) -> FactorWeightRecord:  # noqa: B027
+        """Compute the weight record, implemented by each algorithm"""
         pass
 
+    def get_weight_batch(self, **columns: Sequence) -> np.ndarray:
+        """Get weights of factor for the given columns of values"""
+        return get_weight_batch_by_rows(self.get_weight, columns)
+
+    def get_weight_exponent_batch(self, weights: np.ndarray, **columns: Sequence) -> np.ndarray:
+        """
+        Get the decimal exponents of the weights returned by get_weight_batch,
+        so that Decimal(round(weight * 10**-exponent)).scaleb(exponent) is the weight of get_weight.
+        Weights are quantized to the precision unless the algorithm says otherwise.
+        """
+        return np.full(len(weights), -self.precision, dtype=np.int64)
+
+    def get_decimal_weight_batch(self, weights: np.ndarray, exponents: np.ndarray, **columns: Sequence) -> np.ndarray:
+        """
+        Get the Decimal weights of get_weight, exponents included.
+        By default they are rebuilt from the float64 weights and their exponents.
+        """
+        return to_decimal_array(weights, exponents)
+
     def _quantize(self, num) -> Decimal:
-        quantize_str = f"1.{'0' * self.precision}"
-        return Decimal(str(num)).quantize(Decimal(quantize_str))
+        return Decimal(str(num)).quantize(get_quantum(self.precision))
+
+    def _quantize_batch(
+        self,
+        weights: np.ndarray,
+        exact: Callable[[int], Decimal] | None = None,
+    ) -> np.ndarray:
+        """
+        Vectorized _quantize.
+        np.rint rounds the binary value while _quantize rounds its shortest decimal repr,
+        so weights within rounding error of a tie are recomputed by exact(index),
+        which defaults to _quantize of the weight itself.
+        """
+        scale = 10.0 ** self.precision
+        scaled = weights * scale
+        quantized = np.rint(scaled) / scale
+
+        ties = np.abs(scaled - np.floor(scaled) - 0.5) < QUANTIZE_TIE_TOLERANCE
+        for i in np.flatnonzero(ties).tolist():
+            quantized[i] = float(exact(i) if exact else self._quantize(weights[i].item()))
+
+        return quantized
+
+
+def get_decimal_exponents(values: Sequence) -> np.ndarray:
+    """
+    Get the exponent of Decimal(str(value)) for each value.
+    Numeric arrays convert each distinct value once, other sequences keep the exponent of Decimal items.
+    """
+    if isinstance(values, np.ndarray) and values.dtype != object:
+        unique_values, inverse = np.unique(values, return_inverse=True)
+        exponents = [Decimal(str(value)).as_tuple().exponent for value in unique_values.tolist()]
+        return np.asarray(exponents, dtype=np.int64)[inverse]
+
+    return np.fromiter(
+        (
+            (value if isinstance(value, Decimal) else Decimal(str(value))).as_tuple().exponent
+            for value in values
+        ),
+        dtype=np.int64,
+        count=len(values),
+    )
+
+
+def get_decimal_values(values: Sequence) -> np.ndarray:
+    """
+    Get Decimal(str(value)) for each value as an object array.
+    Numeric arrays convert each distinct value once, Decimal items are kept as they are.
+    """
+    if isinstance(values, np.ndarray) and values.dtype != object:
+        unique_values, inverse = np.unique(values, return_inverse=True)
+        decimals = np.empty(len(unique_values), dtype=object)
+        decimals[:] = [Decimal(str(value)) for value in unique_values.tolist()]
+        return decimals[inverse.reshape(-1)]
+
+    decimals = np.empty(len(values), dtype=object)
+    decimals[:] = [value if isinstance(value, Decimal) else Decimal(str(value)) for value in values]
+    return decimals
+
+
+def to_decimal_array(weights: np.ndarray, exponents: np.ndarray) -> np.ndarray:
+    """
+    Convert float64 weights to Decimals with the given decimal exponents,
+    Decimal(round(weight * 10**-exponent)).scaleb(exponent), each distinct (weight, exponent) once.
+    Weights with more than MAX_DECIMAL_DIGITS significant digits can not be rebuilt exactly and raise ValueError.
+    """
+    pairs = np.stack((weights, exponents.astype(np.float64)), axis=1)
+    unique_pairs, inverse = np.unique(pairs, axis=0, return_inverse=True)
+    if len(unique_pairs) and (np.abs(unique_pairs[:, 0]) * 10.0 ** -unique_pairs[:, 1] >= 10.0 ** MAX_DECIMAL_DIGITS).any():
+        raise ValueError("Weights can not be represented as float64 exactly")
+
+    decimals = np.empty(len(unique_pairs), dtype=object)
+    decimals[:] = [
+        Decimal(round(weight * 10.0 ** -exponent)).scaleb(int(exponent))
+        for weight, exponent in unique_pairs.tolist()
+    ]
+    return decimals[inverse.reshape(-1)]
+
+
+@cache
+def get_quantum(precision: int) -> Decimal:
+    """Get the quantize exponent for the given precision"""
+    return Decimal(f"1.{'0' * precision}")
@@ -1,7 +1,10 @@
+from collections.abc import Sequence
 from decimal import Decimal
 
-from .base import BaseFactor
-from ..schema import FactorWeightResult
+import numpy as np
+
+from .base import BaseFactor, gather_by_sorted_keys
+from ..schema import FactorWeightRecord
 from ..const import FACTOR_ALGORITHM_FIXED
 
 
@@ -14,6 +17,8 @@ class FactorByFixed(BaseFactor):
         precision: int = 2,
         max_weight: Decimal = Decimal(1),
         is_visible: bool = True,
+        *,
+        precompute: bool = False,
         **kwargs,
     ):
         """
@@ -22,19 +27,80 @@ class FactorByFixed(BaseFactor):
         Args:
             name: Factor name
             weights: Dictionary of weights: {value: weight}
+            precompute: 是否在初始化时预计算截断并量化后的权重, 原地修改weights之后需要重新调用precompute_weights
         """
         super().__init__(name, FACTOR_ALGORITHM_FIXED, precision, max_weight, is_visible, **kwargs)
         if not weights:
             raise ValueError("Weights must be provided")
+
+        self.precompute = precompute
+        self._quantized_weights: dict[int | float | Decimal, Decimal] | None = None
+        self._weight_table: tuple[np.ndarray, np.ndarray] | None = None
         self.weights = weights
 
-    def get_weight(self, value: int | float | Decimal) -> FactorWeightResult:
+    @property
+    def weights(self) -> dict[int | Decimal, int | Decimal]:
+        return self._weights
+
+    @weights.setter
+    def weights(self, weights: dict[int | Decimal, int | Decimal]) -> None:
+        """设置权重字典, 重新生成批量查询使用的权重数组"""
+        self._weights = weights
+        if self.precompute:
+            self.precompute_weights()
+        else:
+            self._quantized_weights = None
+            self._weight_table = self._load_weight_table()
+
+    def precompute_weights(self) -> None:
+        """预计算每个值截断并量化后的Decimal权重, 以及按值升序排列的float64值数组和权重数组"""
+        self._quantized_weights = {
+            value: self._quantize(min(weight, self.max_weight))
+            for value, weight in self.weights.items()
+        }
+        self._weight_table = self._load_weight_table()
+
+    @property
+    def has_zero_weight(self) -> bool:
+        """是否存在量化后为0的权重, 这样的因子可能让CPU直接变成0"""
+        return any(not self._quantize(min(weight, self.max_weight)) for weight in self.weights.values())
+
+    def _get_weight_record(self, value: int | float | Decimal) -> FactorWeightRecord:
         """获取权重"""
         if not isinstance(value, int | float | Decimal):
             raise ValueError("Value must be number")
+
+        if self._quantized_weights is not None:
+            if value not in self._quantized_weights:
+                raise ValueError(f"Value {value} not in weight keys")
+            return FactorWeightRecord(value=value, weight=self._quantized_weights[value])
+
         if value not in self.weights:
             raise ValueError(f"Value {value} not in weight keys")
 
         weight = min(self.weights[value], self.max_weight)
         weight = self._quantize(weight)
-        return FactorWeightResult(value=value, weight=weight)
+        return FactorWeightRecord(value=value, weight=weight)
+
+    def get_weight_batch(self, value: Sequence[int | float | Decimal]) -> np.ndarray:
+        """批量获取权重"""
+        values = np.asarray(value, dtype=np.float64)
+        if self._weight_table is None:
+            self._weight_table = self._load_weight_table()
+        keys, table = self._weight_table
+
+        weights, found = gather_by_sorted_keys(keys, table, values)
+        if not found.all():
+            raise ValueError(f"Value {values[~found][0]} not in weight keys")
+
+        return weights
+
+    def _load_weight_table(self) -> tuple[np.ndarray, np.ndarray]:
+        """生成按值升序排列的值数组和量化后的权重数组"""
+        items = sorted(self.weights.items(), key=lambda item: float(item[0]))
+        keys = np.array([float(value) for value, _ in items], dtype=np.float64)
+        table = np.array(
+            [float(self._quantize(min(weight, self.max_weight))) for _, weight in items],
+            dtype=np.float64,
+        )
+        return keys, table
@@ -1,7 +1,10 @@
+from collections.abc import Sequence
 from decimal import Decimal
 
+import numpy as np
+
 from .base import BaseFactor
-from ..schema import FactorWeightResult
+from ..schema import FactorWeightRecord
 from ..const import FACTOR_ALGORITHM_LINEAR
 
 
@@ -41,7 +44,7 @@ class FactorByLinear(BaseFactor):
         self.max_weight = Decimal(str(max_weight))
         self.min_value = Decimal(str(min_value))
 
-    def get_weight(self, value: int | float | Decimal) -> FactorWeightResult:
+    def _get_weight_record(self, value: int | float | Decimal) -> FactorWeightRecord:
         """
         根据公式计算权重:
         y = min_weight + (max_weight - min_weight) / (max_value - min_value) * (x - min_value) for min_value <= x <= max_value
@@ -55,7 +58,7 @@ class FactorByLinear(BaseFactor):
             value: 输入值
 
         Returns:
-            FactorWeightResult: 权重结果
+            FactorWeightRecord: 权重结果
         """
         if not isinstance(value, int | float | Decimal):
             raise ValueError("Value must be number")
@@ -71,4 +74,35 @@ class FactorByLinear(BaseFactor):
             weight = self.min_weight + multiplier * (value - self.min_value)
             weight = self._quantize(weight)
 
-        return FactorWeightResult(value=value, weight=weight)
+        return FactorWeightRecord(value=value, weight=weight)
+
+    def get_weight_batch(self, value: Sequence[int | float | Decimal]) -> np.ndarray:
+        """
+        批量获取权重, 使用截断的仿射变换, 公式同get_weight
+        """
+        column = value
+        values = np.asarray(column, dtype=np.float64)
+
+        if self.max_value > self.min_value:
+            multiplier = (self.max_weight - self.min_weight) / (self.max_value - self.min_value)
+        else:
+            multiplier = Decimal(0)
+        weights = float(self.min_weight) + float(multiplier) * (values - float(self.min_value))
+
+        def exact(i: int) -> Decimal:
+            item = column[i]
+            return self._get_weight_record(item.item() if isinstance(item, np.generic) else item).weight
+
+        weights = self._quantize_batch(weights, exact=exact)
+        weights[values <= float(self.min_value)] = float(self.min_weight)
+        weights[values >= float(self.max_value)] = float(self.max_weight)
+        return weights
+
+    def get_weight_exponent_batch(self, weights: np.ndarray, **columns: Sequence) -> np.ndarray:
+        """
+        批量获取权重的十进制指数, 截断到最小/最大权重的行保留配置中的小数位数, 其他行按精度量化
+        """
+        exponents = np.full(len(weights), -self.precision, dtype=np.int64)
+        exponents[weights == float(self.min_weight)] = self.min_weight.as_tuple().exponent
+        exponents[weights == float(self.max_weight)] = self.max_weight.as_tuple().exponent
+        return exponents
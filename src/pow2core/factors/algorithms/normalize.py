@@ -1,18 +1,36 @@
+import heapq
+import math
+from collections.abc import Sequence
 from decimal import Decimal
 from typing import Literal
 
 import numpy as np
 
-from .base import BaseFactor
-from ..const import NORMALIZE_METHOD_LINEAR, NORMALIZE_METHOD_LOG, FACTOR_ALGORITHM_NORMALIZE
-from ..schema import FactorWeightResult
+from .base import BaseFactor, gather_by_sorted_keys
+from ..const import (
+    ALPHA_SEARCH_BISECT,
+    ALPHA_SEARCH_GRID,
+    FACTOR_ALGORITHM_NORMALIZE,
+    NORMALIZE_METHOD_LINEAR,
+    NORMALIZE_METHOD_LOG,
+    NORMALIZE_STORAGE_ARRAY,
+    NORMALIZE_STORAGE_DICT,
+)
+from ..schema import FactorWeightRecord
 
 
 class FactorByNormalize(BaseFactor):
     """
     通过归一化计算权重, 并设置了平滑因子alpha
-    如果初始化时提供了alpha, 则直接使用该alpha, 否则在alpha允许的范围内步进找到合适的alpha
+    如果初始化时提供了alpha, 则直接使用该alpha, 否则在alpha允许的范围内查找合适的alpha
+    最大最小权重之比只取决于数据的最小值和最大值, 且随alpha单调递减, 查找时只需计算一次统计量
     如果初始提供了待归一化的数据values, 则直接使用values加载权重, 否则需要调用load_weights方法加载权重
+    缩放后的权重等于(f(value) + alpha) / (f(min_value) + alpha), 其中f对线性方法是恒等变换, 对对数方法是log1p
+    analytic模式下不生成权重表, 只记录数据之和与最小值, 直接用该公式计算, 权重表之外的值也可以计算
+    incremental模式在analytic的基础上维护数据的计数、和、最小值与最大值, 可以逐个插入、更新、删除数据,
+    比例超出容差时才重新查找alpha, 不需要重新加载全部数据
+    array存储方式不生成字典, 将去重后的值和缩放后的权重按值升序存成NumPy数组, 用二分查找取值,
+    allow_unseen时不在数据中的值使用记录的alpha和数据之和按解析式计算
     """
     def __init__(
         self,
@@ -28,6 +46,13 @@ class FactorByNormalize(BaseFactor):
         precision: int = 2,
         max_weight: Decimal = Decimal(1),
         is_visible: bool = True,
+        *,
+        alpha_search: Literal[ALPHA_SEARCH_GRID, ALPHA_SEARCH_BISECT] = ALPHA_SEARCH_GRID,
+        analytic: bool = False,
+        incremental: bool = False,
+        storage: Literal[NORMALIZE_STORAGE_DICT, NORMALIZE_STORAGE_ARRAY] = NORMALIZE_STORAGE_DICT,
+        allow_unseen: bool = False,
+        precompute: bool = False,
         **kwargs,
     ):
         """
@@ -44,6 +69,12 @@ class FactorByNormalize(BaseFactor):
             alpha_step: 平滑因子步长
             tolerance: 归一化比例误差
             precision: 权重精度
+            alpha_search: alpha查找方法, grid按步长查找并与历史结果一致, bisect二分查找
+            analytic: 是否使用解析式计算权重, 不生成权重表
+            incremental: 是否使用增量模式, 支持insert_value/update_value/delete_value, 隐含analytic
+            storage: 权重表的存储方式, dict以原始值为键, array为按值升序排列的NumPy数组, analytic模式下无效
+            allow_unseen: array存储方式下, 不在数据中的值是否按解析式计算权重, 否则抛出异常
+            precompute: 加载权重表时是否预计算截断并量化后的权重, analytic模式下无效
         """
         super().__init__(
             name=name,
@@ -57,6 +88,12 @@ class FactorByNormalize(BaseFactor):
         if method not in (NORMALIZE_METHOD_LINEAR, NORMALIZE_METHOD_LOG):
             raise ValueError(f"Invalid normalization method: {method}")
 
+        if alpha_search not in (ALPHA_SEARCH_GRID, ALPHA_SEARCH_BISECT):
+            raise ValueError(f"Invalid alpha search: {alpha_search}")
+
+        if storage not in (NORMALIZE_STORAGE_DICT, NORMALIZE_STORAGE_ARRAY):
+            raise ValueError(f"Invalid storage: {storage}")
+
         self.alpha = alpha
         self.ratio = ratio
         self.method = method
@@ -64,16 +101,176 @@ class FactorByNormalize(BaseFactor):
         self.max_alpha = max_alpha
         self.alpha_step = alpha_step
         self.tolerance = tolerance
+        self.alpha_search = alpha_search
+        self.analytic = analytic or incremental
+        self.incremental = incremental
+        self.storage = storage
+        self.allow_unseen = allow_unseen
+        self.precompute = precompute
+        # array存储方式下按值升序排列的去重值和缩放后(未截断和量化)的权重
+        self._keys: np.ndarray | None = None
+        self._scaled_weights: np.ndarray | None = None
+        self._total: float | None = None
+        self._min_weight: float | None = None
+        self._quantized_weights: dict[int | float | Decimal, Decimal] | None = None
+        self._weight_table: tuple[np.ndarray, np.ndarray] | None = None
+        # 增量模式的统计量: 每个值(float)的计数, 变换后数据之和的精确部分和, 最小值与最大值的惰性删除堆
+        self._counts: dict[float, int] = {}
+        self._partials: list[float] = []
+        self._min_heap: list[float] = []
+        self._max_heap: list[float] = []
         self.values = values
         if self.values:
             self._weights = self.load_weights(values=self.values)
         else:
             self._weights = None
 
-    def load_weights(self, values: list[int | float | Decimal]) -> dict[int | float | Decimal, int | float]:
-        """加载权重"""
+    def load_weights(self, values: list[int | float | Decimal]) -> dict[int | float | Decimal, int | float] | None:
+        """加载权重, analytic模式下只记录数据之和与最小权重, 不生成权重表"""
         alpha = self._find_alpha(values=values)
-        return self._load_weights(values=values, alpha=alpha)
+        self._quantized_weights = None
+        self._weight_table = None
+        if self.incremental:
+            self._load_running_stats(values=values)
+            return None
+
+        if self.analytic:
+            total = self._sum(values=values, alpha=alpha)
+            self._min_weight = (float(self._transform([min(values)])[0]) + alpha) / total
+            self._total = total
+            return None
+
+        if self.storage == NORMALIZE_STORAGE_ARRAY:
+            self._load_weight_arrays(values=values, alpha=alpha)
+            self._weight_table = self._load_weight_table()
+            return None
+
+        weights = self._load_weights(values=values, alpha=alpha)
+        if self.precompute:
+            self.precompute_weights()
+        else:
+            self._weight_table = self._load_weight_table()
+        return weights
+
+    def insert_value(self, value: int | float | Decimal) -> None:
+        """增量模式下插入一个数据"""
+        self._check_incremental()
+        key = float(value)
+        count = self._counts.get(key, 0)
+        self._counts[key] = count + 1
+        _add_partial(self._partials, float(self._transform([key])[0]))
+        if not count:
+            heapq.heappush(self._min_heap, key)
+            heapq.heappush(self._max_heap, -key)
+        self._refresh_running_stats()
+
+    def delete_value(self, value: int | float | Decimal) -> None:
+        """增量模式下删除一个数据"""
+        self._check_incremental()
+        key = float(value)
+        count = self._counts.get(key, 0)
+        if not count:
+            raise ValueError(f"Value {value} not in weight nums")
+
+        if count == 1:
+            del self._counts[key]
+        else:
+            self._counts[key] = count - 1
+        _add_partial(self._partials, -float(self._transform([key])[0]))
+        self._refresh_running_stats()
+
+    def update_value(self, old_value: int | float | Decimal, new_value: int | float | Decimal) -> None:
+        """增量模式下将一个数据从old_value更新为new_value"""
+        self.delete_value(old_value)
+        self.insert_value(new_value)
+
+    def _check_incremental(self) -> None:
+        if not self.incremental:
+            raise ValueError("Incremental mode is not enabled")
+        # 没有指定alpha时需要先用load_weights加载数据并查找alpha
+        if self.alpha is None:
+            raise ValueError("Weights must be loaded before updating values")
+
+    def _load_running_stats(self, values: list[int | float | Decimal]) -> None:
+        """增量模式下按全部数据初始化统计量"""
+        self._counts = {}
+        for value in values:
+            key = float(value)
+            self._counts[key] = self._counts.get(key, 0) + 1
+
+        self._partials = []
+        for data in self._transform(values).tolist():
+            _add_partial(self._partials, data)
+
+        self._min_heap = list(self._counts)
+        heapq.heapify(self._min_heap)
+        self._max_heap = [-key for key in self._counts]
+        heapq.heapify(self._max_heap)
+
+        self._find_alpha(values=values)
+        self._refresh_running_stats()
+
+    def _refresh_running_stats(self) -> None:
+        """
+        增量模式下根据统计量更新数据之和与最小权重, 时间复杂度与数据量无关
+        比例超出容差时重新查找alpha, 找不到满足容差的alpha时抛出异常
+        """
+        while self._min_heap and self._min_heap[0] not in self._counts:
+            heapq.heappop(self._min_heap)
+        while self._max_heap and -self._max_heap[0] not in self._counts:
+            heapq.heappop(self._max_heap)
+
+        if not self._counts:
+            self._total = None
+            self._min_weight = None
+            return
+
+        min_data, max_data = self._transform([self._min_heap[0], -self._max_heap[0]]).tolist()
+        stats = (min_data, max_data, math.fsum(self._partials), sum(self._counts.values()))
+
+        if self.ratio is not None and abs(self._get_ratio(stats, self.alpha) - self.ratio) >= self.tolerance:
+            alpha = self._search_alpha(stats)
+            if alpha is None:
+                raise ValueError(f"Failed to find alpha for given ratio {self.ratio} with tolerance {self.tolerance}")
+            self.alpha = alpha
+
+        total = stats[2] + stats[3] * self.alpha
+        self._min_weight = (min_data + self.alpha) / total
+        self._total = total
+
+    def precompute_weights(self) -> None:
+        """预计算权重表中每个值截断并量化后的Decimal权重, 以及按值升序排列的float64值数组和权重数组"""
+        if self.storage == NORMALIZE_STORAGE_ARRAY:
+            # array存储方式加载时已经生成量化后的权重数组, 不生成字典
+            self._weight_table = self._load_weight_table()
+            return
+
+        self._quantized_weights = {
+            value: self._quantize(min(weight, self.max_weight))
+            for value, weight in self._weights.items()
+        }
+        self._weight_table = self._load_weight_table()
+
+    def to_array_storage(self) -> None:
+        """
+        将dict存储的权重表转成array存储, 缩放后的权重不变, 查询结果与dict存储一致
+        dict存储不允许权重表之外的值, 转换后allow_unseen为False; analytic模式没有权重表, 不做转换
+        """
+        if self.analytic or self.storage == NORMALIZE_STORAGE_ARRAY:
+            return
+
+        self.storage = NORMALIZE_STORAGE_ARRAY
+        self.allow_unseen = False
+        if self._weights:
+            keys = np.fromiter((float(value) for value in self._weights), dtype=np.float64, count=len(self._weights))
+            weights = np.fromiter(self._weights.values(), dtype=np.float64, count=len(self._weights))
+            order = np.argsort(keys, kind="stable")
+            self._keys = keys[order]
+            self._scaled_weights = weights[order]
+
+        self._weights = None
+        self._quantized_weights = None
+        self._weight_table = self._load_weight_table()
 
     def _load_weights(
         self,
@@ -84,17 +281,8 @@ class FactorByNormalize(BaseFactor):
         if values is None:
             raise ValueError("Values must be provided")
 
-        float_values = [float(value) for value in values]
-        data = np.array(float_values)
-
-        if self.method == NORMALIZE_METHOD_LINEAR:
-            data = data + alpha
-            normalized_weights = data / np.sum(data)
-        elif self.method == NORMALIZE_METHOD_LOG:
-            data = np.log1p(data) + alpha
-            normalized_weights = data / np.sum(data)
-        else:
-            raise ValueError(f"Invalid normalization method: {self.method}")
+        data = self._transform(values) + alpha
+        normalized_weights = data / np.sum(data)
 
         min_weight = np.min(normalized_weights)
         scaled_weights = normalized_weights / min_weight
@@ -102,6 +290,35 @@ class FactorByNormalize(BaseFactor):
         self._weights = dict(zip(values, weights, strict=True))
         return self._weights
 
+    def _load_weight_arrays(self, values: list[int | float | Decimal], alpha: float) -> None:
+        """使用alpha加载array存储方式的权重, 运算顺序与_load_weights一致, 同时记录数据之和与最小权重"""
+        if values is None:
+            raise ValueError("Values must be provided")
+
+        data = self._transform(values) + alpha
+        total = np.sum(data)
+        normalized_weights = data / total
+
+        min_weight = np.min(normalized_weights)
+        scaled_weights = normalized_weights / min_weight
+
+        keys, index = np.unique(np.asarray(values, dtype=np.float64), return_index=True)
+        self._keys = keys
+        self._scaled_weights = scaled_weights[index]
+        self._total = float(total)
+        self._min_weight = float(min_weight)
+        self._weights = None
+
+    def _transform(self, values: list[int | float | Decimal]) -> np.ndarray:
+        """将待归一化的数据转成float数组, 对数方法会先取log1p"""
+        data = np.asarray(values, dtype=np.float64)
+
+        if self.method == NORMALIZE_METHOD_LINEAR:
+            return data
+        if self.method == NORMALIZE_METHOD_LOG:
+            return np.log1p(data)
+        raise ValueError(f"Invalid normalization method: {self.method}")
+
     def _find_alpha(
         self,
         values: list[int | float | Decimal],
@@ -110,27 +327,171 @@ class FactorByNormalize(BaseFactor):
         if self.alpha is not None:
             return self.alpha
 
+        if values is None or not len(values):
+            raise ValueError("Values must be provided")
+
+        data = self._transform(values)
+        stats = (float(np.min(data)), float(np.max(data)), float(np.sum(data)), len(data))
+
+        alpha = self._search_alpha(stats)
+        if alpha is None:
+            raise ValueError(f"Failed to find alpha for given ratio {self.ratio} with tolerance {self.tolerance}")
+
+        self.alpha = alpha
+        return alpha
+
+    def _search_alpha(self, stats: tuple[float, float, float, int]) -> float | None:
+        """按alpha_search查找alpha"""
+        if self.alpha_search == ALPHA_SEARCH_BISECT:
+            return self._find_alpha_by_bisect(stats)
+        return self._find_alpha_by_grid(stats)
+
+    def _get_ratio(self, stats: tuple[float, float, float, int], alpha: float) -> float:
+        """使用数据的最小值、最大值、和与数量计算最大最小权重之比"""
+        min_data, max_data, sum_data, count = stats
+        total = sum_data + count * alpha
+        return ((max_data + alpha) / total) / ((min_data + alpha) / total)
+
+    def _find_alpha_by_grid(self, stats: tuple[float, float, float, int]) -> float | None:
+        """按步长从min_alpha开始查找第一个满足容差的alpha, 与逐步加载全部权重的结果一致"""
         alpha = self.min_alpha
         while alpha < self.max_alpha:
-            if not alpha:
-                alpha += self.alpha_step
-                continue
-
-            weights = self._load_weights(values=values, alpha=alpha)
-            actual_ratio = max(weights.values()) / min(weights.values())
-            if abs(actual_ratio - self.ratio) < self.tolerance:
-                self.alpha = alpha
+            if alpha and abs(self._get_ratio(stats, alpha) - self.ratio) < self.tolerance:
                 return alpha
             alpha += self.alpha_step
-        else:  # noqa: PLW0120
-            raise ValueError(f"Failed to find alpha for given ratio {self.ratio} with tolerance {self.tolerance}")
 
-    def get_weight(self, value: int | float | Decimal) -> FactorWeightResult:
+        return None
+
+    def _find_alpha_by_bisect(self, stats: tuple[float, float, float, int]) -> float | None:
+        """在[min_alpha, max_alpha]中二分查找使比例最接近ratio的alpha"""
+        min_data = stats[0]
+
+        def ratio_error(alpha: float) -> float:
+            if min_data + alpha <= 0:
+                return float("inf")
+            return self._get_ratio(stats, alpha) - self.ratio
+
+        low, high = self.min_alpha, self.max_alpha
+        # 比例随alpha单调递减, 区间内无解时直接返回
+        if ratio_error(high) >= self.tolerance or ratio_error(low) <= -self.tolerance:
+            return None
+
+        for _ in range(200):
+            middle = (low + high) / 2
+            if middle in (low, high):
+                break
+            if ratio_error(middle) > 0:
+                low = middle
+            else:
+                high = middle
+
+        alpha = high if abs(ratio_error(high)) <= abs(ratio_error(low)) else low
+        if not alpha or abs(ratio_error(alpha)) >= self.tolerance:
+            return None
+        return alpha
+
+    def _get_weight_record(self, value: int | float | Decimal) -> FactorWeightRecord:
         """获取权重"""
-        if value not in self._weights:
+        if self._quantized_weights is not None:
+            if value not in self._quantized_weights:
+                raise ValueError(f"Value {value} not in weight nums")
+            return FactorWeightRecord(value=value, weight=self._quantized_weights[value])
+
+        if self.analytic:
+            weight = self._get_analytic_weights(np.array([value], dtype=np.float64))[0].item()
+        elif self.storage == NORMALIZE_STORAGE_ARRAY:
+            weight = self._get_array_weight(value)
+        elif value not in self._weights:
             raise ValueError(f"Value {value} not in weight nums")
+        else:
+            weight = self._weights[value]
 
-        weight = min(self._weights[value], self.max_weight)
+        weight = min(weight, self.max_weight)
         weight = self._quantize(weight)
-        return FactorWeightResult(value=value, weight=weight)
+        return FactorWeightRecord(value=value, weight=weight)
+
+    def get_weight_batch(self, value: Sequence[int | float | Decimal]) -> np.ndarray:
+        """批量获取权重"""
+        values = np.asarray(value, dtype=np.float64)
+        if self.analytic:
+            weights = np.minimum(self._get_analytic_weights(values), float(self.max_weight))
+            return self._quantize_batch(weights)
+
+        if self._weight_table is None:
+            self._weight_table = self._load_weight_table()
+        keys, table = self._weight_table
+
+        weights, found = gather_by_sorted_keys(keys, table, values)
+        if not found.all():
+            if not (self.storage == NORMALIZE_STORAGE_ARRAY and self.allow_unseen):
+                raise ValueError(f"Value {values[~found][0]} not in weight nums")
+
+            unseen_weights = np.minimum(self._get_analytic_weights(values[~found]), float(self.max_weight))
+            weights[~found] = self._quantize_batch(unseen_weights)
+
+        return weights
+
+    def _get_array_weight(self, value: int | float | Decimal) -> float:
+        """array存储方式下二分查找缩放后的权重, 不在数据中的值按allow_unseen处理"""
+        if self._keys is None:
+            raise ValueError("Weights must be loaded before getting weight")
+
+        key = float(value)
+        index = int(np.searchsorted(self._keys, key))
+        if index < len(self._keys) and self._keys[index] == key:
+            return self._scaled_weights[index].item()
+
+        if not self.allow_unseen:
+            raise ValueError(f"Value {value} not in weight nums")
+        return self._get_analytic_weights(np.array([key], dtype=np.float64))[0].item()
+
+    def _load_weight_table(self) -> tuple[np.ndarray, np.ndarray]:
+        """生成按值升序排列的值数组和量化后的权重数组"""
+        if self.storage == NORMALIZE_STORAGE_ARRAY and not self.analytic:
+            if self._keys is None:
+                return np.empty(0, dtype=np.float64), np.empty(0, dtype=np.float64)
+            weights = np.minimum(self._scaled_weights, float(self.max_weight))
+            return self._keys, self._quantize_batch(weights)
+
+        if not self._weights:
+            return np.empty(0, dtype=np.float64), np.empty(0, dtype=np.float64)
+
+        keys = np.fromiter((float(value) for value in self._weights), dtype=np.float64, count=len(self._weights))
+        weights = np.fromiter(self._weights.values(), dtype=np.float64, count=len(self._weights))
+        order = np.argsort(keys, kind="stable")
+
+        weights = np.minimum(weights[order], float(self.max_weight))
+        return keys[order], self._quantize_batch(weights)
+
+    def _get_analytic_weights(self, values: np.ndarray) -> np.ndarray:
+        """使用解析式计算缩放后的权重, 运算顺序与_load_weights一致"""
+        if self._total is None:
+            raise ValueError("Weights must be loaded before getting weight")
+
+        return ((self._transform(values) + self.alpha) / self._total) / self._min_weight
+
+    def _sum(self, values: list[int | float | Decimal], alpha: float) -> float:
+        """
+        计算加上alpha之后的数据之和
+        线性方法的整数等差数列加上整数alpha时, 各项和在float中都是精确的, 直接用公式求和, 不生成数组
+        """
+        if isinstance(values, range) and self.method == NORMALIZE_METHOD_LINEAR and float(alpha).is_integer():
+            return (values[0] + values[-1]) * len(values) / 2 + len(values) * alpha
+
+        return float(np.sum(self._transform(values) + alpha))
+
 
+def _add_partial(partials: list[float], x: float) -> None:
+    """将x加入无舍入误差的部分和列表(Shewchuk算法), math.fsum(partials)为正确舍入的总和"""
+    i = 0
+    for partial in partials:
+        y = partial
+        if abs(x) < abs(y):
+            x, y = y, x
+        high = x + y
+        low = y - (high - x)
+        if low:
+            partials[i] = low
+            i += 1
+        x = high
+    partials[i:] = [x]
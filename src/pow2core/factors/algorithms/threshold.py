@@ -1,8 +1,12 @@
+from bisect import bisect_right
+from collections.abc import Sequence
 from decimal import Decimal
 
+import numpy as np
+
 from .base import BaseFactor
 from ..const import FACTOR_ALGORITHM_THRESHOLD
-from ..schema import FactorWeightResult
+from ..schema import FactorWeightRecord
 
 
 class FactorByThreshold(BaseFactor):
@@ -37,17 +41,40 @@ class FactorByThreshold(BaseFactor):
         self.thresholds = sorted(thresholds, reverse=True)
         self.weights = weights
 
-    def get_weight(self, value: int | float | Decimal) -> FactorWeightResult:
+        # 按阈值升序排列的阈值和权重, 权重预先转成Decimal, 查找时二分
+        self._ascending_thresholds = self.thresholds[::-1]
+        self._ascending_weights = [Decimal(str(weight)) for weight in self.weights[::-1]]
+        self._threshold_array = np.array([float(threshold) for threshold in self._ascending_thresholds], dtype=np.float64)
+        self._weight_array = np.array([float(weight) for weight in self._ascending_weights], dtype=np.float64)
+        # 权重不按精度量化, 保留配置中的小数位数
+        self._weight_exponents = {
+            float(weight): weight.as_tuple().exponent for weight in self._ascending_weights
+        }
+
+    def _get_weight_record(self, value: int | float | Decimal) -> FactorWeightRecord:
         """获取权重"""
         if not isinstance(value, int | float | Decimal):
             raise ValueError("Value must be number")
 
-        target_weight = None
-        for threshold, weight in zip(self.thresholds, self.weights, strict=True):
-            if value >= threshold:
-                target_weight = Decimal(str(weight))
-                break
-        else:
+        # 最后一个不大于value的阈值
+        index = bisect_right(self._ascending_thresholds, value) - 1
+        if index < 0:
             raise ValueError(f"Value {value} less than min threshold {self.thresholds[-1]}")
 
-        return FactorWeightResult(value=value, weight=target_weight)
+        return FactorWeightRecord(value=value, weight=self._ascending_weights[index])
+
+    def get_weight_batch(self, value: Sequence[int | float | Decimal]) -> np.ndarray:
+        """批量获取权重, 用numpy.digitize在升序的阈值中二分查找"""
+        values = np.asarray(value, dtype=np.float64)
+
+        index = np.digitize(values, self._threshold_array) - 1
+        if (index < 0).any():
+            raise ValueError(f"Value {values[index < 0][0]} less than min threshold {self.thresholds[-1]}")
+
+        return self._weight_array[index]
+
+    def get_weight_exponent_batch(self, weights: np.ndarray, **columns: Sequence) -> np.ndarray:
+        """批量获取权重的十进制指数, 即配置中权重的小数位数"""
+        unique_weights, inverse = np.unique(weights, return_inverse=True)
+        exponents = [self._weight_exponents.get(weight, -self.precision) for weight in unique_weights.tolist()]
+        return np.asarray(exponents, dtype=np.int64)[inverse]
@@ -1,8 +1,11 @@
+from collections.abc import Sequence
 from decimal import Decimal
 
-from .base import BaseFactor
+import numpy as np
+
+from .base import BaseFactor, get_decimal_exponents, get_decimal_values
 from ..const import FACTOR_ALGORITHM_VALUE
-from ..schema import FactorWeightResult
+from ..schema import FactorWeightRecord
 
 
 class FactorByValue(BaseFactor):
@@ -27,10 +30,24 @@ class FactorByValue(BaseFactor):
             **kwargs,
         )
 
-    def get_weight(self, value: int | float | Decimal) -> FactorWeightResult:
+    def _get_weight_record(self, value: int | float | Decimal) -> FactorWeightRecord:
         """获取权重"""
         if not isinstance(value, int | float | Decimal):
             raise TypeError("Value must be a number")
 
         weight = Decimal(str(value))
-        return FactorWeightResult(value=value, weight=weight)
+        return FactorWeightRecord(value=value, weight=weight)
+
+    def get_weight_batch(self, value: Sequence[int | float | Decimal]) -> np.ndarray:
+        """批量获取权重"""
+        return np.array(value, dtype=np.float64)
+
+    def get_weight_exponent_batch(self, weights: np.ndarray, **columns: Sequence) -> np.ndarray:
+        """批量获取权重的十进制指数, 与值本身的小数位数一致"""
+        (column,) = columns.values()
+        return get_decimal_exponents(column)
+
+    def get_decimal_weight_batch(self, weights: np.ndarray, exponents: np.ndarray, **columns: Sequence) -> np.ndarray:
+        """批量获取Decimal权重, 直接由值构造, 不经过float64, 与get_weight一致"""
+        (column,) = columns.values()
+        return get_decimal_values(column)
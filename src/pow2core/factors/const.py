@@ -9,6 +9,14 @@ FACTOR_ALGORITHM_VALUE = "value"  # 值算法
 NORMALIZE_METHOD_LINEAR = "linear"  # 归一化方法: 线性
 NORMALIZE_METHOD_LOG = "log"  # 归一化方法: 对数
 
+# 归一化alpha查找方法
+ALPHA_SEARCH_GRID = "grid"  # 按步长逐步查找, 与历史结果一致
+ALPHA_SEARCH_BISECT = "bisect"  # 二分查找, 使比例尽量接近目标值
+
+# 归一化权重表的存储方式
+NORMALIZE_STORAGE_DICT = "dict"  # 以原始值为键的字典
+NORMALIZE_STORAGE_ARRAY = "array"  # 按值升序排列的NumPy数组, 二分查找
+
 # 因子名称
 FACTOR_NAME_ASSET = "asset"  # 资产因子
 FACTOR_NAME_COMBINATION = "combination"  # 变压器因子
@@ -22,3 +30,10 @@ FACTOR_NAME_RARE = "rare"  # 稀有度因子
 FACTOR_NAME_VOLUME = "volume"  # 交易量因子
 FACTOR_NAME_POP_USER = "pop_user"  # pop用户因子
 FACTOR_NAME_MINING_LIMIT_REACHED = "mining_limit_reached"  # 挖矿上限因子
+
+# 时间
+MICROSECONDS_PER_SECOND = 1_000_000  # 每秒微秒数
+MICROSECONDS_PER_DAY = 86_400 * MICROSECONDS_PER_SECOND  # 每天微秒数
+
+# 卡槽
+SLOT_TOKEN_ID_BITS = 32  # 打包(collection_id, token_id)成int64键时token_id占用的低位数
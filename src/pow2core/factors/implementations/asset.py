@@ -1,9 +1,12 @@
+from collections.abc import Sequence
 from decimal import Decimal
 
+import numpy as np
+
 from ..algorithms.normalize import FactorByNormalize
-from ..const import FACTOR_NAME_ASSET, NORMALIZE_METHOD_LOG, FACTOR_ALGORITHM_NORMALIZE
+from ..const import FACTOR_NAME_ASSET, NORMALIZE_METHOD_LOG, FACTOR_ALGORITHM_NORMALIZE, ALPHA_SEARCH_GRID
 from ..registry import FactorRegistry
-from ..schema import AssetFactorByNormalizeConfig, FactorWeightResult
+from ..schema import AssetFactorByNormalizeConfig, FactorWeightRecord, FactorWeightResult
 
 
 @FactorRegistry.register(
@@ -24,6 +27,9 @@ class AssetFactorByLogNormalize(FactorByNormalize):
         precision: int = 2,
         max_weight: Decimal = Decimal(1),
         is_visible: bool = True,
+        *,
+        alpha_search: str = ALPHA_SEARCH_GRID,
+        incremental: bool = False,
         **kwargs,
     ):
         super().__init__(
@@ -34,6 +40,8 @@ class AssetFactorByLogNormalize(FactorByNormalize):
             max_alpha=max_alpha,
             alpha_step=alpha_step,
             tolerance=tolerance,
+            alpha_search=alpha_search,
+            incremental=incremental,
             precision=precision,
             max_weight=max_weight,
             is_visible=is_visible,
@@ -43,3 +51,11 @@ class AssetFactorByLogNormalize(FactorByNormalize):
     def get_weight(self, asset: int | float | Decimal) -> FactorWeightResult:
         """获取权重"""
         return super().get_weight(asset)
+
+    def get_weight_record(self, asset: int | float | Decimal) -> FactorWeightRecord:
+        """获取轻量的权重结果"""
+        return super().get_weight_record(asset)
+
+    def get_weight_batch(self, asset: Sequence[int | float | Decimal]) -> np.ndarray:
+        """批量获取权重"""
+        return super().get_weight_batch(asset)
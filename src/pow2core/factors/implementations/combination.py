@@ -1,9 +1,12 @@
+from collections.abc import Sequence
 from decimal import Decimal
 
+import numpy as np
+
 from ..algorithms.value import FactorByValue
 from ..const import FACTOR_NAME_COMBINATION, FACTOR_ALGORITHM_VALUE
 from ..registry import FactorRegistry
-from ..schema import CombinationFactorByValueConfig, FactorWeightResult
+from ..schema import CombinationFactorByValueConfig, FactorWeightRecord, FactorWeightResult
 
 
 @FactorRegistry.register(
@@ -31,3 +34,11 @@ class CombinationFactorByValue(FactorByValue):
     def get_weight(self, ratio: int | float | Decimal) -> FactorWeightResult:
         """获取权重"""
         return super().get_weight(ratio)
+
+    def get_weight_record(self, ratio: int | float | Decimal) -> FactorWeightRecord:
+        """获取轻量的权重结果"""
+        return super().get_weight_record(ratio)
+
+    def get_weight_batch(self, ratio: Sequence[int | float | Decimal]) -> np.ndarray:
+        """批量获取权重"""
+        return super().get_weight_batch(ratio)
@@ -1,10 +1,14 @@
+from collections.abc import Sequence
 from decimal import Decimal
 from datetime import datetime, timezone, timedelta
 
+import numpy as np
+
 from ..algorithms.normalize import FactorByNormalize
 from ..const import FACTOR_NAME_DDAYS, NORMALIZE_METHOD_LINEAR, FACTOR_ALGORITHM_NORMALIZE
 from ..registry import FactorRegistry
-from ..schema import DDaysFactorByNormalizeConfig, FactorWeightResult
+from ..schema import DDaysFactorByNormalizeConfig, FactorWeightRecord, FactorWeightResult
+from ..timestamps import count_days, is_timestamp_array, to_epoch_microseconds
 
 
 @FactorRegistry.register(
@@ -24,20 +28,24 @@ class DDaysFactorByLinearNormalize(FactorByNormalize):
         precision: int = 2,
         max_weight: Decimal = Decimal(1),
         is_visible: bool = True,
+        *,
+        analytic: bool = True,
         **kwargs,
     ):
         self.tz = timezone(timedelta(hours=tz_hours))
         self.now = self.convert_to_tz(now)
         self.created_at = self.convert_to_tz(created_at)
+        self.multiplier = multiplier
 
-        max_days = (self.now - self.created_at).days + 1  # 从1开始, 不足1天算1天
-        days = list(range(1, max_days + 1))
+        max_days = self.get_max_days()
+        days = range(1, max_days + 1)
 
         super().__init__(
             name=FACTOR_NAME_DDAYS,
             values=days,
             alpha=max_days * multiplier,
             method=NORMALIZE_METHOD_LINEAR,
+            analytic=analytic,
             precision=precision,
             max_weight=max_weight,
             is_visible=is_visible,
@@ -45,10 +53,60 @@ class DDaysFactorByLinearNormalize(FactorByNormalize):
         )
 
     def get_weight(self, start_at: datetime) -> FactorWeightResult:
+        return super().get_weight(self.get_days(start_at))
+
+    def get_weight_record(self, start_at: datetime) -> FactorWeightRecord:
+        return super().get_weight_record(self.get_days(start_at))
+
+    def get_weight_batch(self, start_at: Sequence[datetime] | np.ndarray) -> np.ndarray:
+        """批量获取权重, start_at可以是datetime序列, 纪元秒数组或numpy.datetime64数组"""
+        return super().get_weight_batch(self.get_days_batch(start_at))
+
+    def advance_to(self, now: datetime) -> None:
+        """
+        将当前时间推进到now, 天数变化时扩展天数范围, 按新的最大天数更新alpha并重新加载权重
+        所有权重都依赖alpha, 权重表模式需要整体重新计算; 默认的analytic模式只用公式重新计算数据之和,
+        与天数无关, 结果与权重表模式以及按now重新创建因子一致
+        """
+        now = self.convert_to_tz(now)
+        if now < self.now:
+            raise ValueError(f"Can not advance to {now}, earlier than {self.now}")
+
+        self.now = now
+        max_days = self.get_max_days()
+        if max_days == len(self.values):
+            return
+
+        self.values = range(1, max_days + 1)
+        self.alpha = max_days * self.multiplier
+        self._weights = self.load_weights(values=self.values)
+
+    def get_max_days(self) -> int:
+        """获取合集创建至今的天数, 从1开始, 不足1天算1天"""
+        return (self.now - self.created_at).days + 1
+
+    def get_days(self, start_at: datetime) -> int:
+        """获取持有天数, 从1开始, 不足1天算1天, 早于合集创建时间(超过最大天数)时抛出异常"""
         start_at = self.convert_to_tz(start_at)
-        days = (self.now - start_at).days + 1
-        days = max(days, 1)
-        return super().get_weight(days)
+        days = max((self.now - start_at).days + 1, 1)
+        if days > self.get_max_days():
+            raise ValueError(f"Value {days} not in weight nums")
+        return days
+
+    def get_days_batch(self, start_at: Sequence[datetime] | np.ndarray) -> np.ndarray:
+        """批量获取持有天数, 纪元秒数组和numpy.datetime64数组使用整数运算, 其他序列逐个计算"""
+        if not is_timestamp_array(start_at):
+            return np.array([self.get_days(dt) for dt in start_at], dtype=np.int64)
+
+        start_at, valid = to_epoch_microseconds(start_at)
+        if not valid.all():
+            raise ValueError("Start at must not be empty")
+
+        days = count_days(self.now, start_at)
+        exceeded = days > self.get_max_days()
+        if exceeded.any():
+            raise ValueError(f"Value {days[exceeded][0]} not in weight nums")
+        return days
 
     def convert_to_tz(self, dt: datetime) -> datetime:
         return dt.astimezone(tz=self.tz)
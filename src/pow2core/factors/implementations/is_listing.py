@@ -1,9 +1,12 @@
+from collections.abc import Sequence
 from decimal import Decimal
 
+import numpy as np
+
 from ..algorithms.fixed import FactorByFixed
 from ..const import FACTOR_NAME_IS_LISTING, FACTOR_ALGORITHM_FIXED
 from ..registry import FactorRegistry
-from ..schema import FactorWeightResult, IsListingFactorByFixedConfig
+from ..schema import FactorWeightRecord, FactorWeightResult, IsListingFactorByFixedConfig
 
 
 @FactorRegistry.register(
@@ -32,3 +35,9 @@ class IsListingFactorByFixed(FactorByFixed):
 
     def get_weight(self, is_listing: bool) -> FactorWeightResult:
         return super().get_weight(is_listing)
+
+    def get_weight_record(self, is_listing: bool) -> FactorWeightRecord:
+        return super().get_weight_record(is_listing)
+
+    def get_weight_batch(self, is_listing: Sequence[bool]) -> np.ndarray:
+        return super().get_weight_batch(is_listing)
@@ -1,9 +1,12 @@
+from collections.abc import Sequence
 from decimal import Decimal
 
+import numpy as np
+
 from ..algorithms.threshold import FactorByThreshold
 from ..const import FACTOR_NAME_LISTING_COUNT, FACTOR_ALGORITHM_THRESHOLD
 from ..registry import FactorRegistry
-from ..schema import ListingCountFactorByThresholdConfig, FactorWeightResult
+from ..schema import ListingCountFactorByThresholdConfig, FactorWeightRecord, FactorWeightResult
 
 
 @FactorRegistry.register(
@@ -33,3 +36,11 @@ class ListingCountFactorByThreshold(FactorByThreshold):
     def get_weight(self, count: int | float | Decimal) -> FactorWeightResult:
         """获取权重"""
         return super().get_weight(count)
+
+    def get_weight_record(self, count: int | float | Decimal) -> FactorWeightRecord:
+        """获取轻量的权重结果"""
+        return super().get_weight_record(count)
+
+    def get_weight_batch(self, count: Sequence[int | float | Decimal]) -> np.ndarray:
+        """批量获取权重"""
+        return super().get_weight_batch(count)
@@ -1,10 +1,14 @@
+from collections.abc import Sequence
 from datetime import datetime, timezone, timedelta
 from decimal import Decimal
 
+import numpy as np
+
 from ..algorithms.linear import FactorByLinear
 from ..const import FACTOR_NAME_LISTING_DAYS, FACTOR_ALGORITHM_LINEAR
 from ..registry import FactorRegistry
-from ..schema import ListingDaysFactorByLinearConfig, FactorWeightResult
+from ..schema import ListingDaysFactorByLinearConfig, FactorWeightRecord, FactorWeightResult
+from ..timestamps import count_days, is_timestamp_array, to_epoch_microseconds
 
 
 @FactorRegistry.register(
@@ -44,10 +48,44 @@ class ListingDaysFactorByLinear(FactorByLinear):
         if not start_at:
             return FactorWeightResult(value=0, weight=Decimal(self.max_weight))
 
+        return super().get_weight(self.get_days(start_at))
+
+    def get_weight_record(self, start_at: datetime | None) -> FactorWeightRecord:
+        """获取轻量的权重结果"""
+        if not start_at:
+            return FactorWeightRecord(value=0, weight=Decimal(self.max_weight))
+
+        return super().get_weight_record(self.get_days(start_at))
+
+    def get_weight_batch(self, start_at: Sequence[datetime | None] | np.ndarray) -> np.ndarray:
+        """
+        批量获取权重, 未挂单的行使用最大权重
+        start_at可以是datetime序列(None表示未挂单), 纪元秒数组(NaN表示未挂单)或numpy.datetime64数组(NaT表示未挂单)
+        """
+        if is_timestamp_array(start_at):
+            start_at, is_listing = to_epoch_microseconds(start_at)
+            days = np.where(is_listing, count_days(self.now, start_at), 0)
+        else:
+            is_listing = np.array([bool(dt) for dt in start_at], dtype=bool)
+            days = [self.get_days(dt) if dt else 0 for dt in start_at]
+
+        weights = super().get_weight_batch(days)
+        weights[~is_listing] = float(self.max_weight)
+        return weights
+
+    def advance_to(self, now: datetime) -> None:
+        """将当前时间推进到now"""
+        now = self.convert_to_tz(now)
+        if now < self.now:
+            raise ValueError(f"Can not advance to {now}, earlier than {self.now}")
+
+        self.now = now
+
+    def get_days(self, start_at: datetime) -> int:
+        """获取挂单天数, 从1开始, 不足1天算1天"""
         start_at = self.convert_to_tz(start_at)
         days = (self.now - start_at).days + 1
-        days = max(days, 1)
-        return super().get_weight(days)
+        return max(days, 1)
 
     def convert_to_tz(self, dt: datetime) -> datetime:
         """转换时区"""
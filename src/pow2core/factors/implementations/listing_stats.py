@@ -1,11 +1,15 @@
+from collections.abc import Sequence
 from datetime import datetime
 from decimal import Decimal
 
+import numpy as np
+
+from ..algorithms.base import to_decimal_array
 from ..const import FACTOR_NAME_LISTING_STATS
 from .listing_days import ListingDaysFactorByLinear
 from .listing_count import ListingCountFactorByThreshold
 from ..registry import FactorRegistry
-from ..schema import FactorWeightResult, ListingStatsFactorConfig
+from ..schema import FactorWeightRecord, FactorWeightResult, ListingStatsFactorConfig
 
 
 @FactorRegistry.register(
@@ -32,20 +36,99 @@ class ListingStatsFactor:
         self.is_visible = is_visible
         self.kwargs = kwargs
 
+    def advance_to(self, now: datetime) -> None:
+        """将挂单天数因子的当前时间推进到now"""
+        self.listing_days_factor.advance_to(now)
+
     def get_weight(self, listing_start_at: datetime, listing_count: int | Decimal) -> FactorWeightResult:
         """获取权重"""
-        result = FactorWeightResult(value=Decimal(0), weight=Decimal(0), children={})
+        return self.get_weight_record(listing_start_at, listing_count).to_model()
 
-        listing_count_weight = self.listing_count_factor.get_weight(listing_count)
-        result.children[self.listing_count_factor.name] = listing_count_weight
-        listing_days_weight = self.listing_days_factor.get_weight(listing_start_at)
-        result.children[self.listing_days_factor.name] = listing_days_weight
+    def get_weight_record(self, listing_start_at: datetime, listing_count: int | Decimal) -> FactorWeightRecord:
+        """获取轻量的权重结果"""
+        listing_count_weight = self.listing_count_factor.get_weight_record(listing_count)
+        listing_days_weight = self.listing_days_factor.get_weight_record(listing_start_at)
+        children = {
+            self.listing_count_factor.name: listing_count_weight,
+            self.listing_days_factor.name: listing_days_weight,
+        }
 
         if listing_count_weight.weight < 1:
-            result.value = listing_count_weight.value
-            result.weight = listing_count_weight.weight
-        else:
-            result.value = listing_days_weight.value
-            result.weight = listing_days_weight.weight
+            return FactorWeightRecord(listing_count_weight.value, listing_count_weight.weight, children)
+        return FactorWeightRecord(listing_days_weight.value, listing_days_weight.weight, children)
+
+    def get_weight_batch(
+        self,
+        listing_start_at: Sequence[datetime | None] | np.ndarray,
+        listing_count: Sequence[int | Decimal],
+    ) -> np.ndarray:
+        """批量获取权重, 挂单数量权重小于1的行不计算挂单天数"""
+        children = self.get_children_weight_batch(listing_start_at, listing_count)
+        count_weights = children[self.listing_count_factor.name]
+        days_weights = children[self.listing_days_factor.name]
+        return np.where(count_weights < 1, count_weights, days_weights)
+
+    def get_weight_exponent_batch(
+        self,
+        weights: np.ndarray,
+        listing_start_at: Sequence[datetime | None] | np.ndarray,
+        listing_count: Sequence[int | Decimal],
+    ) -> np.ndarray:
+        """
+        批量获取权重的十进制指数, 按每行取的是挂单数量还是挂单天数的权重分别获取
+        取挂单数量权重的行权重一定小于1; 挂单天数权重不会小于1时直接按权重区分,
+        否则只对权重小于1的行重新判断挂单数量权重
+        """
+        is_count = weights < 1
+        days_factor = self.listing_days_factor
+        if min(days_factor.min_weight, days_factor.max_weight) < 1 and is_count.any():
+            rows = np.flatnonzero(is_count)
+            if isinstance(listing_count, np.ndarray):
+                counts = listing_count[rows]
+            else:
+                counts = [listing_count[i] for i in rows.tolist()]
+            is_count[rows] = self.listing_count_factor.get_weight_batch(counts) < 1
+
+        exponents = np.empty(len(weights), dtype=np.int64)
+        exponents[is_count] = self.listing_count_factor.get_weight_exponent_batch(weights[is_count])
+        exponents[~is_count] = self.listing_days_factor.get_weight_exponent_batch(weights[~is_count])
+        return exponents
+
+    def get_decimal_weight_batch(
+        self,
+        weights: np.ndarray,
+        exponents: np.ndarray,
+        listing_start_at: Sequence[datetime | None] | np.ndarray,
+        listing_count: Sequence[int | Decimal],
+    ) -> np.ndarray:
+        """批量获取Decimal权重, 子因子的权重都是量化后的值, 由float64权重和指数构造"""
+        return to_decimal_array(weights, exponents)
+
+    def get_children_weight_batch(
+        self,
+        listing_start_at: Sequence[datetime | None] | np.ndarray,
+        listing_count: Sequence[int | Decimal],
+    ) -> dict[str, np.ndarray]:
+        """
+        批量获取子因子的权重, 先计算所有行的挂单数量权重, 只对挂单数量权重不小于1的行计算挂单天数权重
+
+        Returns:
+            dict[str, np.ndarray]: 子因子名称到权重数组, 与输入的行一一对应, 没有计算的挂单天数权重为NaN
+        """
+        count_weights = self.listing_count_factor.get_weight_batch(listing_count)
+        days_weights = np.full(len(count_weights), np.nan)
+
+        rows = np.flatnonzero(count_weights >= 1)
+        if len(rows) == len(count_weights):
+            days_weights = self.listing_days_factor.get_weight_batch(listing_start_at)
+        elif len(rows):
+            if isinstance(listing_start_at, np.ndarray):
+                start_at = listing_start_at[rows]
+            else:
+                start_at = [listing_start_at[i] for i in rows.tolist()]
+            days_weights[rows] = self.listing_days_factor.get_weight_batch(start_at)
 
-        return result
+        return {
+            self.listing_count_factor.name: count_weights,
+            self.listing_days_factor.name: days_weights,
+        }
@@ -1,9 +1,12 @@
+from collections.abc import Sequence
 from decimal import Decimal
 
+import numpy as np
+
 from ..algorithms.fixed import FactorByFixed
 from ..const import FACTOR_NAME_MINING_LIMIT_REACHED, FACTOR_ALGORITHM_FIXED
 from ..registry import FactorRegistry
-from ..schema import FactorWeightResult, MiningLimitReachedFactorByFixedConfig
+from ..schema import FactorWeightRecord, FactorWeightResult, MiningLimitReachedFactorByFixedConfig
 
 
 @FactorRegistry.register(
@@ -32,3 +35,9 @@ class MiningLimitReachedFactorByFixed(FactorByFixed):
 
     def get_weight(self, is_reached: bool) -> FactorWeightResult:
         return super().get_weight(is_reached)
+
+    def get_weight_record(self, is_reached: bool) -> FactorWeightRecord:
+        return super().get_weight_record(is_reached)
+
+    def get_weight_batch(self, is_reached: Sequence[bool]) -> np.ndarray:
+        return super().get_weight_batch(is_reached)
@@ -1,9 +1,12 @@
+from collections.abc import Sequence
 from decimal import Decimal
 
+import numpy as np
+
 from ..algorithms.fixed import FactorByFixed
 from ..const import FACTOR_NAME_POP_USER, FACTOR_ALGORITHM_FIXED
 from ..registry import FactorRegistry
-from ..schema import FactorWeightResult, POPUserFactorByFixedConfig
+from ..schema import FactorWeightRecord, FactorWeightResult, POPUserFactorByFixedConfig
 
 
 @FactorRegistry.register(
@@ -32,3 +35,9 @@ class POPUserFactorByFixed(FactorByFixed):
 
     def get_weight(self, is_pop_user: bool) -> FactorWeightResult:
         return super().get_weight(is_pop_user)
+
+    def get_weight_record(self, is_pop_user: bool) -> FactorWeightRecord:
+        return super().get_weight_record(is_pop_user)
+
+    def get_weight_batch(self, is_pop_user: Sequence[bool]) -> np.ndarray:
+        return super().get_weight_batch(is_pop_user)
@@ -1,10 +1,13 @@
+from collections.abc import Sequence
 from decimal import Decimal
 
+import numpy as np
+
 from ..algorithms.fixed import FactorByFixed
 from ..algorithms.normalize import FactorByNormalize
 from ..const import FACTOR_NAME_RARE, NORMALIZE_METHOD_LINEAR, FACTOR_ALGORITHM_FIXED, FACTOR_ALGORITHM_NORMALIZE
 from ..registry import FactorRegistry
-from ..schema import FactorWeightResult, RareFactorByFixedConfig, RareFactorByNormalizeConfig
+from ..schema import FactorWeightRecord, FactorWeightResult, RareFactorByFixedConfig, RareFactorByNormalizeConfig
 
 
 @FactorRegistry.register(
@@ -48,18 +51,21 @@ class RareFactorByLinearNormalize(FactorByNormalize):
         precision: int = 2,
         max_weight: Decimal = Decimal(1),
         is_visible: bool = True,
+        *,
+        analytic: bool = False,
         **kwargs,
     ):
         self.min_rare = min_rare
         self.max_rare = max_rare
         # 稀有度低的权重高
-        rares = list(range(min_rare, max_rare+1))
+        rares = range(min_rare, max_rare+1)
 
         super().__init__(
             name=FACTOR_NAME_RARE,
             values=rares,
             alpha=alpha,
             method=NORMALIZE_METHOD_LINEAR,
+            analytic=analytic,
             precision=precision,
             max_weight=max_weight,
             is_visible=is_visible,
@@ -72,3 +78,15 @@ class RareFactorByLinearNormalize(FactorByNormalize):
         result = super().get_weight(value)
         result.value = rare
         return result
+
+    def get_weight_record(self, rare: int) -> FactorWeightRecord:
+        """获取轻量的权重结果"""
+        value = self.max_rare - rare + 1
+        result = super().get_weight_record(value)
+        result.value = rare
+        return result
+
+    def get_weight_batch(self, rare: Sequence[int]) -> np.ndarray:
+        """批量获取权重"""
+        values = self.max_rare - np.asarray(rare, dtype=np.int64) + 1
+        return super().get_weight_batch(values)
@@ -1,9 +1,12 @@
+from collections.abc import Iterable, Sequence
 from decimal import Decimal
 
+import numpy as np
+
 from ..algorithms.fixed import FactorByFixed
-from ..const import FACTOR_NAME_SLOT, FACTOR_ALGORITHM_FIXED
+from ..const import FACTOR_NAME_SLOT, FACTOR_ALGORITHM_FIXED, SLOT_TOKEN_ID_BITS
 from ..registry import FactorRegistry
-from ..schema import FactorWeightResult, SlotFactorByFixedConfig
+from ..schema import FactorWeightRecord, FactorWeightResult, SlotFactorByFixedConfig
 
 
 @FactorRegistry.register(
@@ -31,11 +34,83 @@ class SlotFactorByFixed(FactorByFixed):
             is_visible=is_visible,
             **kwargs,
         )
-        self.tokens_with_slot: list[tuple[int, int]] = []
+        self._tokens_with_slot: set[tuple[int, int]] = set()
+        # 排序后的打包键, 有id不能打包时为None; _packed_keys_ready为False时需要重新生成
+        self._packed_keys: np.ndarray | None = None
+        self._packed_keys_ready = False
+
+    @property
+    def tokens_with_slot(self) -> set[tuple[int, int]]:
+        """具有卡槽的(collection_id, token_id)集合"""
+        return self._tokens_with_slot
+
+    @tokens_with_slot.setter
+    def tokens_with_slot(self, tokens: Iterable[tuple[int, int]]) -> None:
+        self._tokens_with_slot = {(collection_id, token_id) for collection_id, token_id in tokens}
+        self._packed_keys_ready = False
 
     def load_tokens_with_slot(self, rare_balances: dict[int, list[tuple[int, int]]]):
         """
-        获取具有卡槽的tokenid列表
+        获取具有卡槽的tokenid列表, 加入tokens_with_slot, 重复加载不会产生重复的token
+
+        Args:
+            rare_balances: 按照稀有度分组的(collection_id, token_id)列表
+        """
+        self._tokens_with_slot.update(self.get_tokens_with_slot(rare_balances))
+        self._packed_keys_ready = False
+
+    def load_tokens_with_slot_batch(self, rare_balances_list: Iterable[dict[int, list[tuple[int, int]]]]):
+        """
+        批量加载多个用户的rare_balances
+
+        Args:
+            rare_balances_list: 每个用户按照稀有度分组的(collection_id, token_id)列表
+        """
+        for rare_balances in rare_balances_list:
+            self._tokens_with_slot.update(self.get_tokens_with_slot(rare_balances))
+        self._packed_keys_ready = False
+
+    def load_tokens_with_slot_table(
+        self,
+        owner: Sequence,
+        rare: Sequence[int],
+        collection_id: Sequence[int],
+        token_id: Sequence[int],
+    ) -> np.ndarray:
+        """
+        从所有持有者的扁平表一次性加载具有卡槽的token, 结果与逐个用户调用load_tokens_with_slot一致
+        每个持有者每个稀有度按表中的顺序取前 套数 * 所需数量 个token
+
+        Args:
+            owner: 持有者
+            rare: 稀有度
+            collection_id: 合集id
+            token_id: token id
+
+        Returns:
+            np.ndarray: 每行是否具有卡槽的bool数组
+        """
+        has_slot = get_slot_mask(owner, rare, self.rare_requirements)
+        collection_ids = np.asarray(collection_id)[has_slot].tolist()
+        token_ids = np.asarray(token_id)[has_slot].tolist()
+
+        self._tokens_with_slot.update(zip(collection_ids, token_ids, strict=True))
+        self._packed_keys_ready = False
+        return has_slot
+
+    def remove_tokens_with_slot(self, tokens: Iterable[tuple[int, int]]):
+        """
+        从tokens_with_slot中移除token, 用于两个周期之间持仓变化, 不存在的token忽略
+
+        Args:
+            tokens: (collection_id, token_id)列表
+        """
+        self._tokens_with_slot.difference_update((collection_id, token_id) for collection_id, token_id in tokens)
+        self._packed_keys_ready = False
+
+    def get_tokens_with_slot(self, rare_balances: dict[int, list[tuple[int, int]]]) -> list[tuple[int, int]]:
+        """
+        计算一个用户具有卡槽的tokenid列表
 
         Args:
             rare_balances: 按照稀有度分组的(collection_id, token_id)列表
@@ -48,12 +123,52 @@ class SlotFactorByFixed(FactorByFixed):
             for rare in self.rare_requirements
         ])
 
-        new_tokens_with_slot = [
+        return [
             (collection_id, token_id)
             for rare in self.rare_requirements
             for collection_id, token_id in rare_balances[rare][:set_count * self.rare_requirements[rare]]
         ]
-        self.tokens_with_slot.extend(new_tokens_with_slot)
+
+    def has_slot_batch(self, collection_id: Sequence[int], token_id: Sequence[int]) -> np.ndarray:
+        """
+        批量查询token是否具有卡槽
+        所有id都能打包成int64时, 在排序后的打包键中二分查找, 否则逐个在集合中查找
+
+        Returns:
+            np.ndarray: bool数组
+        """
+        packed_keys = self._get_packed_keys()
+        collection_ids = np.asarray(collection_id)
+        token_ids = np.asarray(token_id)
+        if packed_keys is not None and can_pack_slot_keys(collection_ids, token_ids):
+            keys = pack_slot_keys(collection_ids, token_ids)
+            if not len(packed_keys):
+                return np.zeros(len(keys), dtype=bool)
+            index = np.searchsorted(packed_keys, keys).clip(max=len(packed_keys) - 1)
+            return packed_keys[index] == keys
+
+        tokens_with_slot = self._tokens_with_slot
+        return np.array(
+            [token in tokens_with_slot for token in zip(collection_ids.tolist(), token_ids.tolist(), strict=True)],
+            dtype=bool,
+        )
+
+    def _get_packed_keys(self) -> np.ndarray | None:
+        """排序后的打包键, 修改tokens_with_slot后重新生成, 有id不能打包时返回None, 结果缓存到下次修改"""
+        if not self._packed_keys_ready:
+            self._packed_keys = self._load_packed_keys()
+            self._packed_keys_ready = True
+        return self._packed_keys
+
+    def _load_packed_keys(self) -> np.ndarray | None:
+        """生成排序后的打包键, 有id不能打包时返回None"""
+        if not self._tokens_with_slot:
+            return np.empty(0, dtype=np.int64)
+
+        collection_ids, token_ids = (np.array(ids, dtype=object) for ids in zip(*self._tokens_with_slot, strict=True))
+        if not can_pack_slot_keys(collection_ids, token_ids):
+            return None
+        return np.sort(pack_slot_keys(collection_ids, token_ids))
 
     def get_weight(self, collection_id: int, token_id: int) -> FactorWeightResult:
         """
@@ -62,3 +177,76 @@ class SlotFactorByFixed(FactorByFixed):
         """
         value = (collection_id, token_id) in self.tokens_with_slot
         return super().get_weight(value)
+
+    def get_weight_record(self, collection_id: int, token_id: int) -> FactorWeightRecord:
+        """
+        获取token的轻量权重结果
+        调用之前应该调用 load_tokens_with_slot 更新 tokens_with_slot
+        """
+        value = (collection_id, token_id) in self.tokens_with_slot
+        return super().get_weight_record(value)
+
+    def get_weight_batch(self, collection_id: Sequence[int], token_id: Sequence[int]) -> np.ndarray:
+        """批量获取token的权重"""
+        return super().get_weight_batch(self.has_slot_batch(collection_id, token_id))
+
+
+def get_slot_mask(owner: Sequence, rare: Sequence[int], rare_requirements: dict[int, int]) -> np.ndarray:
+    """
+    按持有者分组计数, 计算每行是否具有卡槽
+    每个持有者的套数是各稀有度 数量 // 所需数量 的最小值, 每个持有者每个稀有度按表中的顺序前 套数 * 所需数量 行具有卡槽
+
+    Args:
+        owner: 持有者
+        rare: 稀有度
+        rare_requirements: 每个稀有度所需的token数量
+
+    Returns:
+        np.ndarray: 每行是否具有卡槽的bool数组
+    """
+    rares = np.asarray(rare)
+    has_slot = np.zeros(len(rares), dtype=bool)
+    if not len(rares) or not rare_requirements:
+        return has_slot
+
+    _, owner_index = np.unique(np.asarray(owner), return_inverse=True)
+    required_rares = np.array(sorted(rare_requirements))
+    requirements = np.array([rare_requirements[required_rare] for required_rare in required_rares.tolist()])
+
+    # 只有要求中的稀有度参与计数, 其他稀有度没有卡槽
+    rare_index = np.searchsorted(required_rares, rares).clip(max=len(required_rares) - 1)
+    is_required = required_rares[rare_index] == rares
+    rows = np.flatnonzero(is_required)
+    if not len(rows):
+        return has_slot
+    owner_index, rare_index = owner_index[rows], rare_index[rows]
+
+    # 每个(持有者, 稀有度)一组, 组内按表中顺序编号
+    groups = owner_index * len(required_rares) + rare_index
+    counts = np.bincount(groups, minlength=(owner_index.max() + 1) * len(required_rares))
+    set_counts = (counts.reshape(-1, len(required_rares)) // requirements).min(axis=1)
+
+    order = np.argsort(groups, kind="stable")
+    group_starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    ranks = np.empty(len(rows), dtype=np.int64)
+    ranks[order] = np.arange(len(rows)) - group_starts[groups[order]]
+
+    has_slot[rows] = ranks < set_counts[owner_index] * requirements[rare_index]
+    return has_slot
+
+
+def can_pack_slot_keys(collection_ids: np.ndarray, token_ids: np.ndarray) -> bool:
+    """collection_id和token_id是否都能打包成int64键"""
+    if not len(collection_ids):
+        return True
+    if collection_ids.dtype.kind not in "iuO" or token_ids.dtype.kind not in "iuO":
+        return False
+    return (
+        collection_ids.min() >= 0 and collection_ids.max() < 2 ** (63 - SLOT_TOKEN_ID_BITS)
+        and token_ids.min() >= 0 and token_ids.max() < 2 ** SLOT_TOKEN_ID_BITS
+    )
+
+
+def pack_slot_keys(collection_ids: np.ndarray, token_ids: np.ndarray) -> np.ndarray:
+    """将collection_id和token_id打包成int64键: collection_id << SLOT_TOKEN_ID_BITS | token_id"""
+    return (collection_ids.astype(np.int64) << SLOT_TOKEN_ID_BITS) | token_ids.astype(np.int64)
@@ -1,10 +1,13 @@
+from collections.abc import Sequence
 from decimal import Decimal
 
+import numpy as np
+
 from ..algorithms.linear import FactorByLinear
 from ..algorithms.normalize import FactorByNormalize
-from ..const import FACTOR_NAME_VOLUME, NORMALIZE_METHOD_LOG, FACTOR_ALGORITHM_LINEAR, FACTOR_ALGORITHM_NORMALIZE
+from ..const import FACTOR_NAME_VOLUME, NORMALIZE_METHOD_LOG, FACTOR_ALGORITHM_LINEAR, FACTOR_ALGORITHM_NORMALIZE, ALPHA_SEARCH_GRID
 from ..registry import FactorRegistry
-from ..schema import VolumeFactorByLinearConfig, VolumeFactorByNormalizeConfig, FactorWeightResult
+from ..schema import VolumeFactorByLinearConfig, VolumeFactorByNormalizeConfig, FactorWeightRecord, FactorWeightResult
 
 
 @FactorRegistry.register(
@@ -54,6 +57,9 @@ class VolumeFactorByLogNormalize(FactorByNormalize):
         precision: int = 2,
         max_weight: Decimal = Decimal(1),
         is_visible: bool = True,
+        *,
+        alpha_search: str = ALPHA_SEARCH_GRID,
+        incremental: bool = False,
         **kwargs,
     ):
         super().__init__(
@@ -64,6 +70,8 @@ class VolumeFactorByLogNormalize(FactorByNormalize):
             max_alpha=max_alpha,
             alpha_step=alpha_step,
             tolerance=tolerance,
+            alpha_search=alpha_search,
+            incremental=incremental,
             precision=precision,
             max_weight=max_weight,
             is_visible=is_visible,
@@ -73,3 +81,11 @@ class VolumeFactorByLogNormalize(FactorByNormalize):
     def get_weight(self, volume: int | float | Decimal) -> FactorWeightResult:
         """获取权重"""
         return super().get_weight(volume)
+
+    def get_weight_record(self, volume: int | float | Decimal) -> FactorWeightRecord:
+        """获取轻量的权重结果"""
+        return super().get_weight_record(volume)
+
+    def get_weight_batch(self, volume: Sequence[int | float | Decimal]) -> np.ndarray:
+        """批量获取权重"""
+        return super().get_weight_batch(volume)
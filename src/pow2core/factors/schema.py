@@ -1,8 +1,11 @@
+from dataclasses import dataclass
 from datetime import datetime
 from decimal import Decimal
 
 from pydantic import BaseModel, field_validator, Field
 
+from .const import ALPHA_SEARCH_GRID, NORMALIZE_STORAGE_DICT
+
 
 class BaseFactorConfig(BaseModel):
     """因子配置基类"""
@@ -20,6 +23,11 @@ class AssetFactorByNormalizeConfig(BaseFactorConfig):
     max_alpha: float = Field(description="最大alpha")
     alpha_step: float = Field(description="alpha步长")
     tolerance: float = Field(description="alpha查找的容差")
+    alpha_search: str = Field(description="alpha查找方法: grid/bisect", default=ALPHA_SEARCH_GRID)
+    incremental: bool = Field(description="是否使用增量模式, 支持逐个插入、更新、删除数据", default=False)
+    storage: str = Field(description="权重表存储方式: dict/array", default=NORMALIZE_STORAGE_DICT)
+    allow_unseen: bool = Field(description="array存储方式下是否按解析式计算不在数据中的值", default=False)
+    precompute: bool = Field(description="是否在加载时预计算量化后的权重", default=False)
 
 
 class CombinationFactorByValueConfig(BaseFactorConfig):
@@ -31,6 +39,7 @@ class SlotFactorByFixedConfig(BaseFactorConfig):
     """使用固定值计算卡槽权重配置"""
     weights: dict[bool, int | Decimal] = Field(description="值与权重的映射")
     rare_requirements: dict[int, int] = Field(description="稀有度要求")
+    precompute: bool = Field(description="是否在加载时预计算量化后的权重", default=False)
 
 
 class DDaysFactorByNormalizeConfig(BaseFactorConfig):
@@ -39,6 +48,8 @@ class DDaysFactorByNormalizeConfig(BaseFactorConfig):
     multiplier: float = Field(description="乘数, 用于生成归一化的alpha")
     created_at: datetime = Field(description="合集的创建时间")
     tz_hours: int = Field(description="时区偏移", default=8)
+    analytic: bool = Field(description="是否使用解析式计算权重, 不生成权重表", default=True)
+    precompute: bool = Field(description="是否在加载时预计算量化后的权重", default=False)
 
     @field_validator("created_at", mode="before")
     @classmethod
@@ -68,6 +79,7 @@ class ListingStatsFactorConfig(BaseFactorConfig):
 class RareFactorByFixedConfig(BaseFactorConfig):
     """使用固定值计算稀有度权重配置"""
     weights: dict[int | Decimal, int | Decimal] = Field(description="稀有度与权重的映射")
+    precompute: bool = Field(description="是否在加载时预计算量化后的权重", default=False)
 
 
 class RareFactorByNormalizeConfig(BaseFactorConfig):
@@ -76,6 +88,8 @@ class RareFactorByNormalizeConfig(BaseFactorConfig):
     min_rare: int = Field(description="最小稀有度")
     max_rare: int = Field(description="最大稀有度")
     alpha: float = Field(description="alpha值")
+    analytic: bool = Field(description="是否使用解析式计算权重, 不生成权重表", default=False)
+    precompute: bool = Field(description="是否在加载时预计算量化后的权重", default=False)
 
 
 class VolumeFactorByLinearConfig(BaseFactorConfig):
@@ -94,6 +108,11 @@ class VolumeFactorByNormalizeConfig(BaseFactorConfig):
     max_alpha: float = Field(description="最大alpha")
     alpha_step: float = Field(description="alpha步长")
     tolerance: float = Field(description="alpha查找的容差")
+    alpha_search: str = Field(description="alpha查找方法: grid/bisect", default=ALPHA_SEARCH_GRID)
+    incremental: bool = Field(description="是否使用增量模式, 支持逐个插入、更新、删除数据", default=False)
+    storage: str = Field(description="权重表存储方式: dict/array", default=NORMALIZE_STORAGE_DICT)
+    allow_unseen: bool = Field(description="array存储方式下是否按解析式计算不在数据中的值", default=False)
+    precompute: bool = Field(description="是否在加载时预计算量化后的权重", default=False)
 
 
 class FactorWeightResult(BaseModel):
@@ -103,17 +122,35 @@ class FactorWeightResult(BaseModel):
     children: dict[str, 'FactorWeightResult'] | None = Field(default=None, description="子因子权重结果")
 
 
+@dataclass(slots=True)
+class FactorWeightRecord:
+    """轻量的因子权重结果, 不做校验, 需要序列化时用to_model转成FactorWeightResult"""
+    value: int | float | Decimal
+    weight: Decimal
+    children: dict[str, 'FactorWeightRecord'] | None = None
+
+    def to_model(self) -> FactorWeightResult:
+        """转成FactorWeightResult"""
+        children = None
+        if self.children is not None:
+            children = {name: child.to_model() for name, child in self.children.items()}
+        return FactorWeightResult(value=self.value, weight=self.weight, children=children)
+
+
 class POPUserFactorByFixedConfig(BaseFactorConfig):
     """使用固定值计算POP用户权重配置"""
     weights: dict[bool, int | Decimal] = Field(description="值与权重的映射")
+    precompute: bool = Field(description="是否在加载时预计算量化后的权重", default=False)
 
 
 class IsListingFactorByFixedConfig(BaseFactorConfig):
     """使用固定值计算是否正在挂单权重配置"""
     weights: dict[bool, int | Decimal] = Field(description="值与权重的映射")
+    precompute: bool = Field(description="是否在加载时预计算量化后的权重", default=False)
 
 
 class MiningLimitReachedFactorByFixedConfig(BaseFactorConfig):
     """使用固定值计算是否达到挖矿上限权重配置"""
     weights: dict[bool, int | Decimal] = Field(description="值与权重的映射")
+    precompute: bool = Field(description="是否在加载时预计算量化后的权重", default=False)
 
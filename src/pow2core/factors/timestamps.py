@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from .const import MICROSECONDS_PER_DAY, MICROSECONDS_PER_SECOND
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)  # noqa: UP017
+
+
+def is_timestamp_array(values) -> bool:
+    """是否为纪元秒(整数或浮点数)或numpy.datetime64数组, 可以用整数运算批量计算天数"""
+    return isinstance(values, np.ndarray) and values.dtype.kind in "Miuf"
+
+
+def to_epoch_microseconds(values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    将纪元秒或numpy.datetime64数组转成UTC纪元微秒
+
+    Args:
+        values: 纪元秒数组, 或没有时区的numpy.datetime64数组(按UTC处理)
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: int64纪元微秒数组, 以及有效值掩码(NaT和NaN无效, 对应的微秒为0)
+    """
+    if values.dtype.kind == "M":
+        valid = ~np.isnat(values)
+        microseconds = values.astype("datetime64[us]").astype(np.int64)
+    elif values.dtype.kind == "f":
+        valid = ~np.isnan(values)
+        microseconds = np.rint(np.where(valid, values, 0) * MICROSECONDS_PER_SECOND).astype(np.int64)
+    else:
+        valid = np.ones(len(values), dtype=bool)
+        microseconds = values.astype(np.int64) * MICROSECONDS_PER_SECOND
+
+    return np.where(valid, microseconds, 0), valid
+
+
+def count_days(now: datetime, start_at: np.ndarray) -> np.ndarray:
+    """
+    批量计算从start_at到now的天数, 从1开始, 不足1天算1天
+    与逐个计算(now - start_at).days + 1一致: 两个时间转到同一时区后相减与时区无关, 所以tz_hours不影响天数
+
+    Args:
+        now: 当前时间
+        start_at: int64纪元微秒数组
+
+    Returns:
+        np.ndarray: int64天数数组
+    """
+    now_microseconds = (now - EPOCH) // timedelta(microseconds=1)
+    days = np.floor_divide(now_microseconds - start_at, MICROSECONDS_PER_DAY) + 1
+    return np.maximum(days, 1)
@@ -0,0 +1,181 @@
+from collections.abc import Callable, Sequence
+from datetime import datetime
+
+import numpy as np
+
+from .ranking import rank_owners, rank_owners_by_tiers
+from .schema import EpochSettlementResult
+from ..config.schema import DiamondConfig, MineSeasonConfig
+from ..cpu.calculator import CPUCalculator
+from ..cpu.const import CPU_ENGINE_FIXED_POINT
+from ..cpu.fixed_point import INT64_SAFE_LIMIT, to_decimal
+from ..distribute_strategies.const import DISTRIBUTE_STRATEGY_FIXED_GROUP, DISTRIBUTE_STRATEGY_LEVEL_GROUP
+from ..distribute_strategies.fixed_group import FixedGroupStrategy
+from ..distribute_strategies.level_group import LevelGroupStrategy
+
+
+class EpochSettlement:
+    """
+    周期结算
+    1. 批量计算所有token的CPU
+    2. 按持有者分组求和
+    3. 按CPU从高到低排名, CPU相同时按持有者升序
+    4. 按赛季的钻石分配策略给每个排名分配钻石, 按排名累计的钻石总数不超过每个周期的钻石数量
+    """
+
+    def __init__(
+        self,
+        config: MineSeasonConfig,
+        now: datetime | None = None,
+        short_circuit: bool = False,
+        setup: Callable[[CPUCalculator], None] | None = None,
+        exact_ranks: int | None = None,
+        per_epoch_diamonds: int | None = None,
+    ):
+        """
+        初始化周期结算
+
+        Args:
+            config: 挖钻赛季配置
+            now: 当前时间
+            short_circuit: 是否短路计算, 同CPUCalculator
+            setup: 加载因子之后调用, 用于加载数据, 如交易量的load_weights, 卡槽的load_tokens_with_slot
+            exact_ranks: 准确排名的名次数, None表示所有持有者完整排序;
+                设置后按钻石组分层排名, 之后的持有者只确定所在组, 排名是所在组的开始排名, 钻石分配不变
+            per_epoch_diamonds: 每个周期的钻石数量, None表示使用赛季配置的per_epoch_diamonds
+        """
+        if exact_ranks is not None and exact_ranks < 0:
+            raise ValueError(f"Invalid exact ranks: {exact_ranks}")
+        if per_epoch_diamonds is None:
+            per_epoch_diamonds = config.season.per_epoch_diamonds
+        if per_epoch_diamonds < 0:
+            raise ValueError(f"Invalid per epoch diamonds: {per_epoch_diamonds}")
+
+        self.config = config
+        self.calculator = CPUCalculator(config.cpu, now=now, short_circuit=short_circuit)
+        self.calculator.load_factors()
+        if setup is not None:
+            setup(self.calculator)
+
+        self.strategy = load_distribute_strategy(config.diamond)
+        self.exact_ranks = exact_ranks
+        self.per_epoch_diamonds = per_epoch_diamonds
+
+    def advance_to(self, now: datetime) -> None:
+        """将计算器的当前时间推进到now"""
+        self.calculator.advance_to(now)
+
+    def settle(
+        self,
+        owners: Sequence | np.ndarray,
+        values: dict[str, dict[str, Sequence]],
+    ) -> EpochSettlementResult:
+        """
+        结算一个周期
+
+        Args:
+            owners: 每个token的持有者, 与values的行一一对应
+            values: 因子值字典, 同CPUCalculator.calculate_batch
+
+        Returns:
+            EpochSettlementResult: 按排名排序的持有者结算表
+        """
+        tokens = self.calculator.calculate_batch(values, engine=CPU_ENGINE_FIXED_POINT)
+        if len(owners) != len(tokens.cpu):
+            raise ValueError(f"Owners length {len(owners)} != values length {len(tokens.cpu)}")
+
+        # 持有者按升序去重, 同一持有者的token在排序后连续, 用reduceat分组求和
+        unique_owners, inverse, token_count = np.unique(np.asarray(owners), return_inverse=True, return_counts=True)
+        # 每行CPU的小数位数可能不同, 先对齐到最大的小数位数再求和
+        places = tokens.cpu_exponent
+        max_places = int(places.max()) if len(places) else 0
+        shifts = max_places - places
+        products = tokens.cpu_scaled
+        if products.dtype != object and len(products):
+            magnitudes = np.abs(products).astype(np.float64) * 10.0 ** shifts
+            if np.bincount(inverse, weights=magnitudes).max() >= INT64_SAFE_LIMIT:
+                products = products.astype(object)
+        if products.dtype == object:
+            products = products * np.array([10 ** int(shift) for shift in shifts.tolist()], dtype=object)
+        else:
+            products = products * 10 ** shifts
+
+        if len(products):
+            order = np.argsort(inverse, kind="stable")
+            starts = np.concatenate(([0], np.cumsum(token_count)[:-1]))
+            owner_scaled = np.add.reduceat(products[order], starts)
+            # 与Decimal求和一致, 持有者CPU的小数位数是其token中最大的小数位数
+            owner_places = np.maximum.reduceat(places[order], starts)
+        else:
+            owner_scaled = np.zeros(0, dtype=np.int64)
+            owner_places = np.zeros(0, dtype=np.int64)
+
+        ranked = int((owner_scaled > 0).sum())
+        if self.exact_ranks is None:
+            order, ranking = rank_owners(owner_scaled)
+        else:
+            order, ranking = rank_owners_by_tiers(owner_scaled, self.get_boundaries(ranked), self.exact_ranks)
+        diamonds = np.zeros(len(unique_owners), dtype=np.int64)
+        diamonds[order[:ranked]] = self.get_diamonds(ranked)
+
+        return EpochSettlementResult(
+            owner=unique_owners[order],
+            cpu=to_decimal(
+                owner_scaled[order] // 10 ** (max_places - owner_places[order]),
+                owner_places[order],
+            ),
+            token_count=token_count[order],
+            ranking=ranking[order],
+            diamonds=diamonds[order],
+            tokens=tokens,
+        )
+
+    def get_boundaries(self, total_users: int) -> list[int]:
+        """获取有排名的人数为total_users时每组结束排名(不含)的累计边界"""
+        if isinstance(self.strategy, LevelGroupStrategy):
+            return self.strategy.get_layout(total_users).boundaries
+        return self.strategy.boundaries
+
+    def get_diamonds(self, total_users: int) -> np.ndarray:
+        """
+        获取排名0到total_users-1的钻石数量
+        固定组策略非严格模式下超过预设人数的排名不分配钻石, 严格模式下人数必须与预设人数一致
+        按排名累计的钻石总数截断到per_epoch_diamonds, 超出的部分不分配
+
+        Args:
+            total_users: 有排名的人数
+
+        Returns:
+            np.ndarray: 钻石数量数组, 索引是排名
+        """
+        if isinstance(self.strategy, LevelGroupStrategy):
+            diamonds = self.strategy.get_all_distribution_array(total_users)
+        elif self.config.diamond.config.strict:
+            diamonds = self.strategy.get_all_distribution_array(total_users, strict=True)
+        else:
+            diamonds = np.zeros(total_users, dtype=np.int64)
+            rewarded = min(total_users, self.strategy.boundaries[-1])
+            diamonds[:rewarded] = self.strategy.get_all_distribution_array(rewarded)
+
+        cumulative = np.cumsum(diamonds)
+        if len(cumulative) and cumulative[-1] > self.per_epoch_diamonds:
+            diamonds = np.diff(np.minimum(cumulative, self.per_epoch_diamonds), prepend=0)
+        return diamonds
+
+
+def load_distribute_strategy(config: DiamondConfig) -> FixedGroupStrategy | LevelGroupStrategy:
+    """按钻石配置创建分配策略"""
+    if config.strategy == DISTRIBUTE_STRATEGY_FIXED_GROUP:
+        return FixedGroupStrategy(
+            user_groups=config.config.user_groups,
+            diamond_groups=config.config.diamond_groups,
+        )
+
+    if config.strategy == DISTRIBUTE_STRATEGY_LEVEL_GROUP:
+        return LevelGroupStrategy(
+            group_ratios=config.config.group_ratios,
+            base_diamond_groups=config.config.base_group_diamonds,
+            level_thresholds=config.config.thresholds,
+        )
+
+    raise ValueError(f"Invalid diamond strategy: {config.strategy}")
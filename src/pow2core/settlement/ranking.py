@@ -0,0 +1,81 @@
+from collections.abc import Sequence
+
+import numpy as np
+
+
+def rank_owners(cpu: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    按CPU从高到低排名, CPU相同时保持原来的顺序, CPU为0的不参与排名
+
+    Args:
+        cpu: 按持有者升序排列的CPU数组
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: 按排名排列的下标, 以及每个持有者的排名(从0开始, CPU为0为-1)
+    """
+    order = np.argsort(-cpu, kind="stable")
+    ranked = int((cpu > 0).sum())
+    ranking = np.full(len(cpu), -1, dtype=np.int64)
+    ranking[order[:ranked]] = np.arange(ranked)
+    return order, ranking
+
+
+def rank_owners_by_tiers(
+    cpu: np.ndarray,
+    boundaries: Sequence[int],
+    exact_ranks: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    按钻石组的累计边界分层排名, 只对前exact_ranks名完整排序, 之后的组只确定成员不排序
+    用numpy.partition(argpartition的取值形式)一次找到所有边界上的CPU, 与边界CPU相同的持有者按原来的顺序分到边界两侧,
+    所以每个组的成员和完整排序(rank_owners)一致
+
+    Args:
+        cpu: 按持有者升序排列的CPU数组
+        boundaries: 每组结束排名(不含)的累计边界, 如FixedGroupStrategy.boundaries
+        exact_ranks: 完整排序的名次数, 本身也作为一个边界
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: 按排名排列的下标, 以及每个持有者的排名;
+            前exact_ranks名是准确排名, 之后组内按原来的顺序排列, 排名是所在组的开始排名, CPU为0为-1
+    """
+    if cpu.dtype == object:
+        # 超过int64的CPU不能用partition, 退回完整排序
+        return rank_owners(cpu)
+
+    candidates = np.flatnonzero(cpu > 0)
+    size = len(candidates)
+    keys = -cpu[candidates]
+
+    cuts = np.unique(np.clip(np.append(np.asarray(boundaries, dtype=np.int64), exact_ranks), 0, size))
+    cuts = cuts[(cuts > 0) & (cuts < size)]
+    if len(cuts):
+        # 每个边界前最后一名的CPU, 严格小于/大于的持有者所在组是确定的
+        thresholds = np.partition(keys, cuts - 1)[cuts - 1]
+        # 与边界CPU相同的持有者先都分到最前面的组, 累计人数超过边界说明相同CPU跨过了这个边界
+        tiers = np.searchsorted(thresholds, keys, side="left")
+        straddled = np.cumsum(np.bincount(tiers, minlength=len(cuts) + 1)[:-1]) > cuts
+        for threshold in np.unique(thresholds[straddled]).tolist():
+            # 相同CPU占据连续的名次, 按原来的顺序分到各组
+            ties = np.flatnonzero(keys == threshold)
+            start = int((keys < threshold).sum())
+            tiers[ties] = np.searchsorted(cuts, start + np.arange(len(ties)), side="right")
+    else:
+        tiers = np.zeros(size, dtype=np.int64)
+
+    # 组号很小, 稳定排序使用基数排序, 组内保持原来的顺序
+    tier_dtype = np.uint16 if len(cuts) < np.iinfo(np.uint16).max else np.int64
+    positions = np.argsort(tiers.astype(tier_dtype), kind="stable")
+
+    exact_end = min(max(exact_ranks, 0), size)
+    head = positions[:exact_end]
+    positions[:exact_end] = head[np.argsort(keys[head], kind="stable")]
+
+    starts = np.concatenate(([0], cuts))
+    candidate_ranking = starts[tiers[positions]]
+    candidate_ranking[:exact_end] = np.arange(exact_end)
+
+    ranking = np.full(len(cpu), -1, dtype=np.int64)
+    ranking[candidates[positions]] = candidate_ranking
+    order = np.concatenate((candidates[positions], np.flatnonzero(cpu <= 0)))
+    return order, ranking
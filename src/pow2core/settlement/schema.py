@@ -0,0 +1,16 @@
+import numpy as np
+from pydantic import BaseModel, ConfigDict, Field
+
+from ..cpu.schema import CPUBatchResult
+
+
+class EpochSettlementResult(BaseModel):
+    """周期结算结果, 按持有者排列的列式表, 行按排名排序, CPU为0没有排名的持有者在最后"""
+    owner: np.ndarray = Field(description="持有者数组")
+    cpu: np.ndarray = Field(description="持有者所有token的CPU之和数组, 元素为Decimal")
+    token_count: np.ndarray = Field(description="持有者的token数量数组")
+    ranking: np.ndarray = Field(description="排名数组, 从0开始, CPU为0的持有者为-1")
+    diamonds: np.ndarray = Field(description="钻石数量数组")
+    tokens: CPUBatchResult = Field(description="每个token的批量CPU计算结果, 下标对应输入的行")
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
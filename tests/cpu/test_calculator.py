@@ -1,6 +1,9 @@
 from datetime import datetime, timezone, timedelta
 from decimal import Decimal
 
+import numpy as np
+import pytest
+
 from pow2core.config.load_config import LoadMineSeasonConfig
 from pow2core.cpu.calculator import CPUCalculator
 
@@ -34,3 +37,246 @@ class TestCalculator:
             print(f"  value: {factor_weight.value}")
         print("cpu:", result.cpu)
 
+
+    def test_calculate_batch_matches_calculate(self):
+        now = datetime.now(timezone.utc)
+        season_config = LoadMineSeasonConfig().load_config("gcw-s14")
+        calculator = CPUCalculator(season_config.cpu, now=now)
+        calculator.load_factors()
+
+        volumes = [0, 1, Decimal("2.5"), 10, 100, 1000]
+        calculator.factors["volume"].load_weights(volumes)
+
+        rows = [
+            {
+                "rare": {"rare": rare},
+                "d_days": {"start_at": now - timedelta(days=days)},
+                "volume": {"volume": volume},
+                "combination": {"ratio": ratio},
+                "listing_stats": {
+                    "listing_start_at": listing_start_at,
+                    "listing_count": listing_count,
+                },
+                "is_listing": {"is_listing": is_listing},
+                "pop_user": {"is_pop_user": is_pop_user},
+            }
+            for rare, days, volume, ratio, listing_start_at, listing_count, is_listing, is_pop_user in [
+                (1, 0, 0, Decimal(1), None, 0, False, True),
+                (2339, 10, 1, Decimal("1.025"), now - timedelta(days=3), 5, False, True),
+                (9432, 100, Decimal("2.5"), Decimal(2), now - timedelta(days=30), 15, False, True),
+                (500, 200, 1000, Decimal("3.125"), now - timedelta(hours=1), 30, True, True),
+                (7000, 300, 100, Decimal(1), None, 0, False, False),
+            ]
+        ]
+        columns = {
+            factor_name: {
+                param_name: [row[factor_name][param_name] for row in rows]
+                for param_name in rows[0][factor_name]
+            }
+            for factor_name in rows[0]
+        }
+
+        batch_result = calculator.calculate_batch(columns)
+
+        for i, row in enumerate(rows):
+            result = calculator.calculate(row)
+            assert batch_result.cpu[i].as_tuple() == result.cpu.as_tuple()
+            assert str(batch_result.cpu[i]) == str(result.cpu)
+            for factor_name, factor_weight in result.factor_weights.items():
+                assert Decimal(str(batch_result.factor_weights[factor_name][i])) == factor_weight.weight
+
+    def test_calculate_batch_length_mismatch(self):
+        season_config = LoadMineSeasonConfig().load_config("example-s1")
+        calculator = CPUCalculator(season_config.cpu)
+        calculator.load_factors()
+
+        now = datetime.now(timezone.utc)
+        columns = {
+            "rare": {"rare": [1, 2]},
+            "d_days": {"start_at": [now]},
+            "combination": {"ratio": [Decimal(1), Decimal(1)]},
+            "listing_stats": {"listing_start_at": [None, None], "listing_count": [0, 0]},
+        }
+        with pytest.raises(ValueError, match="length"):
+            calculator.calculate_batch(columns)
+
+    def test_calculate_batch_fixed_point(self):
+        now = datetime.now(timezone.utc)
+        season_config = LoadMineSeasonConfig().load_config("example-s1")
+        calculator = CPUCalculator(season_config.cpu, now=now)
+        calculator.load_factors()
+
+        columns = {
+            "rare": {"rare": [1, 100, 2339, 9432]},
+            "d_days": {"start_at": [now - timedelta(days=days) for days in (0, 10, 100, 200)]},
+            "combination": {"ratio": [Decimal(1), Decimal("1.025"), Decimal(2), Decimal("1.1")]},
+            "listing_stats": {
+                "listing_start_at": [None, now - timedelta(days=3), now - timedelta(days=30), None],
+                "listing_count": [0, 5, 15, 30],
+            },
+        }
+
+        decimal_result = calculator.calculate_batch(columns)
+        fixed_point_result = calculator.calculate_batch(columns, engine="fixed_point", verify_sample=4)
+
+        assert [str(cpu) for cpu in fixed_point_result.cpu] == [str(cpu) for cpu in decimal_result.cpu]
+        for i, cpu in enumerate(fixed_point_result.cpu.tolist()):
+            assert cpu.as_tuple() == calculator.calculate_cpu({
+                factor_name: {param_name: column[i] for param_name, column in params.items()}
+                for factor_name, params in columns.items()
+            }).as_tuple()
+            scaled = Decimal(int(fixed_point_result.cpu_scaled[i])).scaleb(-int(fixed_point_result.cpu_exponent[i]))
+            assert scaled.as_tuple() == cpu.as_tuple()
+
+    def test_calculate_batch_long_decimal_values(self):
+        now = datetime.now(timezone.utc)
+        season_config = LoadMineSeasonConfig().load_config("example-s1")
+        calculator = CPUCalculator(season_config.cpu, now=now)
+        calculator.load_factors()
+
+        ratios = [Decimal("1.23456789012345678"), Decimal("12345678901.123456")]
+        columns = {
+            "rare": {"rare": [100, 100]},
+            "d_days": {"start_at": [now, now]},
+            "combination": {"ratio": ratios},
+            "listing_stats": {"listing_start_at": [None, None], "listing_count": [0, 0]},
+        }
+
+        # 值因子的Decimal权重不经过float64, 与calculate完全一致
+        result = calculator.calculate_batch(columns, verify_sample=2)
+        for i, cpu in enumerate(result.cpu.tolist()):
+            assert str(cpu) == str(calculator.calculate_cpu({
+                factor_name: {param_name: column[i] for param_name, column in params.items()}
+                for factor_name, params in columns.items()
+            }))
+
+        with pytest.raises(ValueError, match="can not be represented as fixed point"):
+            calculator.calculate_batch(columns, engine="fixed_point")
+
+    def test_calculate_batch_invalid_engine(self):
+        season_config = LoadMineSeasonConfig().load_config("example-s1")
+        calculator = CPUCalculator(season_config.cpu)
+        calculator.load_factors()
+
+        with pytest.raises(ValueError, match="Invalid engine: float"):
+            calculator.calculate_batch({}, engine="float")
+
+    def test_compile_plan_by_priority(self):
+        season_config = LoadMineSeasonConfig().load_config("og-s10")
+        calculator = CPUCalculator(season_config.cpu)
+        calculator.load_factors()
+
+        priorities = [calculator.priorities[step.name] for step in calculator.plan]
+        assert priorities == sorted(priorities, reverse=True)
+        assert {step.name for step in calculator.plan} == set(calculator.factors)
+        assert calculator.plan[0].name == "rare"
+        assert calculator.plan[-1].param_names == ("is_pop_user",)
+
+        calculator.remove_factor("rare")
+        assert "rare" not in [step.name for step in calculator.plan]
+
+    def test_calculate_invalid_values(self):
+        season_config = LoadMineSeasonConfig().load_config("example-s1")
+        calculator = CPUCalculator(season_config.cpu)
+        calculator.load_factors()
+
+        with pytest.raises(ValueError, match="not in values"):
+            calculator.calculate({"rare": {"rare": 100}})
+
+        values = {factor_name: 1 for factor_name in calculator.factors}
+        with pytest.raises(ValueError, match="params must be a dict"):
+            calculator.calculate(values)
+
+        values = {factor_name: {} for factor_name in calculator.factors}
+        with pytest.raises(ValueError, match="params"):
+            calculator.calculate(values)
+
+        values = {
+            "rare": {"rare": 100, "bogus": 1},
+            "d_days": {"start_at": datetime.now(timezone.utc)},
+            "combination": {"ratio": Decimal(1)},
+            "listing_stats": {"listing_start_at": None, "listing_count": 0},
+        }
+        with pytest.raises(ValueError, match=r"Factor rare params \['bogus', 'rare'\] != \['rare'\]"):
+            calculator.calculate(values)
+        with pytest.raises(ValueError, match="Factor rare params"):
+            calculator.calculate_cpu(values)
+
+    def test_short_circuit(self):
+        now = datetime.now(timezone.utc)
+        season_config = LoadMineSeasonConfig().load_config("gcw-s14")
+        calculator = CPUCalculator(season_config.cpu, now=now)
+        calculator.load_factors()
+        short_circuit_calculator = CPUCalculator(season_config.cpu, now=now, short_circuit=True)
+        short_circuit_calculator.load_factors()
+        for loaded_calculator in (calculator, short_circuit_calculator):
+            loaded_calculator.factors["volume"].load_weights([0, 1, 10])
+
+        assert {step.name for step in short_circuit_calculator.plan[:2]} == {"is_listing", "pop_user"}
+
+        columns = {
+            "rare": {"rare": [1, 2339, 9432, 500]},
+            "d_days": {"start_at": [now - timedelta(days=days) for days in (0, 10, 100, 200)]},
+            "volume": {"volume": [0, 0, 0, 0]},
+            "combination": {"ratio": [Decimal(1), Decimal("1.025"), Decimal(2), Decimal(1)]},
+            "listing_stats": {"listing_start_at": [None, None, now - timedelta(days=3), None], "listing_count": [0, 1, 5, 0]},
+            "is_listing": {"is_listing": [False, True, False, False]},
+            "pop_user": {"is_pop_user": [True, True, False, True]},
+        }
+        batch_result = short_circuit_calculator.calculate_batch(columns, verify_sample=4)
+        expected = calculator.calculate_batch(columns)
+
+        assert batch_result.cpu.tolist() == expected.cpu.tolist()
+        assert batch_result.cpu[1] == 0 and batch_result.cpu[2] == 0
+        assert np.isnan(batch_result.factor_weights["rare"][[1, 2]]).all()
+        assert not np.isnan(batch_result.factor_weights["rare"][[0, 3]]).any()
+
+        row = {factor_name: {name: column[1] for name, column in params.items()} for factor_name, params in columns.items()}
+        result = short_circuit_calculator.calculate(row)
+        assert result.cpu == 0
+        assert "rare" in result.skipped_factors and "rare" not in result.factor_weights
+        assert calculator.calculate(row).skipped_factors == []
+
+    def test_calculate_record(self):
+        now = datetime.now(timezone.utc)
+        season_config = LoadMineSeasonConfig().load_config("example-s1")
+        calculator = CPUCalculator(season_config.cpu, now=now)
+        calculator.load_factors()
+
+        row = {
+            "rare": {"rare": 100},
+            "d_days": {"start_at": now - timedelta(days=10)},
+            "combination": {"ratio": Decimal(2)},
+            "listing_stats": {"listing_start_at": now - timedelta(days=3), "listing_count": 15},
+        }
+        result = calculator.calculate(row)
+        record = calculator.calculate_record(row)
+
+        assert record.cpu == result.cpu
+        assert record.factor_weights["listing_stats"].children is not None
+        assert record.to_model() == result
+        assert calculator.calculate_cpu(row) == result.cpu
+
+    def test_advance_to(self):
+        now = datetime.now(timezone.utc)
+        later = now + timedelta(days=3)
+        season_config = LoadMineSeasonConfig().load_config("example-s1")
+        calculator = CPUCalculator(season_config.cpu, now=now)
+        calculator.load_factors()
+        rare_factor = calculator.factors["rare"]
+
+        calculator.advance_to(later)
+        expected = CPUCalculator(season_config.cpu, now=later)
+        expected.load_factors()
+
+        row = {
+            "rare": {"rare": 100},
+            "d_days": {"start_at": now - timedelta(days=10)},
+            "combination": {"ratio": Decimal(2)},
+            "listing_stats": {"listing_start_at": now - timedelta(days=1), "listing_count": 0},
+        }
+        assert calculator.factors["rare"] is rare_factor
+        assert calculator.calculate(row) == expected.calculate(row)
+
+        with pytest.raises(ValueError, match="Can not advance"):
+            calculator.advance_to(now)
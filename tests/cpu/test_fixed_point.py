@@ -0,0 +1,60 @@
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from pow2core.cpu.fixed_point import multiply_fixed_point, to_decimal, to_fixed_point
+
+
+class TestFixedPoint:
+    def test_to_fixed_point(self):
+        scaled = to_fixed_point(np.array([1.06, 0.25, 10.0, 1.025]), np.array([-2, -2, -2, -3]))
+
+        assert scaled.tolist() == [106, 25, 1000, 1025]
+
+    def test_to_fixed_point_integers(self):
+        scaled = to_fixed_point(np.array([0.0, 1.0, 20.0]), np.array([0, -2, 1]))
+
+        assert scaled.tolist() == [0, 100, 2]
+
+    def test_to_fixed_point_fails(self):
+        with pytest.raises(ValueError, match="can not be represented as fixed point"):
+            to_fixed_point(np.array([1 / 3]), np.array([-16]))
+        # 指数不大但有效数字超过15位
+        with pytest.raises(ValueError, match="can not be represented as fixed point"):
+            to_fixed_point(np.array([12345678901.123456]), np.array([-6]))
+
+    def test_multiply_matches_decimal(self):
+        weights = [
+            ["10.00", "7.77", "1.00"],
+            ["1.1", "1.06", "1"],
+            ["20.00", "3.45", "1.00"],
+            ["30", "1.025", "1.000"],
+            ["5.00", "0.25", "1.00"],
+            ["1.00", "1.00", "0.00"],
+        ]
+        decimals = [[Decimal(weight) for weight in factor_weights] for factor_weights in weights]
+        exponents = [np.array([weight.as_tuple().exponent for weight in factor_weights]) for factor_weights in decimals]
+        scaled = [
+            to_fixed_point(np.array([float(weight) for weight in factor_weights]), factor_exponents)
+            for factor_weights, factor_exponents in zip(decimals, exponents, strict=True)
+        ]
+
+        products = multiply_fixed_point(10000, scaled, 3)
+        cpu = to_decimal(products, -sum(exponents))
+
+        for i in range(3):
+            expected = Decimal(10000)
+            for factor_weights in decimals:
+                expected *= factor_weights[i]
+            assert str(cpu[i]) == str(expected)
+
+    def test_multiply_overflow_int64(self):
+        weights = [np.array([9999999, 1])] * 4
+        products = multiply_fixed_point(12345, weights, 2)
+
+        # The first row overflows int64 and falls back to python int
+        assert products.dtype == object
+        cpu = to_decimal(products, np.array([8, 8]))
+        assert cpu[0] == Decimal(12345) * Decimal("99999.99") ** 4
+        assert str(cpu[1]) == "0.00012345"
@@ -0,0 +1,50 @@
+from datetime import datetime, timezone, timedelta
+from decimal import Decimal
+
+import pytest
+
+from pow2core.config.load_config import LoadMineSeasonConfig
+from pow2core.cpu.calculator import CPUCalculator
+from pow2core.cpu.parallel import ParallelCPUCalculator
+
+
+def load_volumes(calculator: CPUCalculator) -> None:
+    calculator.factors["volume"].load_weights([0, 1, 10, 100])
+
+
+NOW = datetime.now(timezone.utc)
+ROWS = [
+    {
+        "rare": {"rare": rare},
+        "d_days": {"start_at": NOW - timedelta(days=rare % 300)},
+        "volume": {"volume": [0, 1, 10, 100][rare % 4]},
+        "combination": {"ratio": Decimal(1)},
+        "listing_stats": {"listing_start_at": None, "listing_count": rare % 20},
+        "is_listing": {"is_listing": rare % 7 == 0},
+        "pop_user": {"is_pop_user": True},
+    }
+    for rare in range(1, 200)
+]
+
+
+class TestParallelCPUCalculator:
+    def test_matches_calculator(self):
+        season_config = LoadMineSeasonConfig().load_config("gcw-s14")
+        calculator = CPUCalculator(season_config.cpu, now=NOW)
+        calculator.load_factors()
+        load_volumes(calculator)
+
+        with ParallelCPUCalculator(
+            season_config.cpu, now=NOW, workers=2, chunk_size=16, setup=load_volumes,
+        ) as parallel_calculator:
+            records = parallel_calculator.calculate_records(ROWS)
+            cpus = parallel_calculator.calculate_cpus(iter(ROWS))
+
+        expected = [calculator.calculate(row) for row in ROWS]
+        assert [record.to_model() for record in records] == expected
+        assert cpus == [result.cpu for result in expected]
+
+    def test_invalid_chunk_size(self):
+        season_config = LoadMineSeasonConfig().load_config("gcw-s14")
+        with pytest.raises(ValueError, match="Invalid chunk size"):
+            ParallelCPUCalculator(season_config.cpu, chunk_size=0)
@@ -0,0 +1,67 @@
+from datetime import datetime, timezone, timedelta
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from pow2core.config.load_config import LoadMineSeasonConfig
+from pow2core.cpu.calculator import CPUCalculator
+from pow2core.cpu.snapshot import load_snapshot, save_snapshot
+
+
+class TestSnapshot:
+    def test_save_and_load(self, tmp_path):
+        now = datetime.now(timezone.utc)
+        season_config = LoadMineSeasonConfig().load_config("gcw-s14")
+        calculator = CPUCalculator(season_config.cpu, now=now)
+        calculator.load_factors()
+        calculator.factors["volume"].load_weights([0, 1, 10, 100])
+
+        path = tmp_path / "gcw-s14.snapshot"
+        save_snapshot(calculator, path)
+        restored = load_snapshot(path)
+
+        # 保存快照不修改传入的计算器
+        assert calculator.factors["rare"].storage == "dict"
+        assert len(calculator.factors["rare"]._weights) == 9432
+        assert calculator.factors["volume"]._weights is not None
+
+        assert restored.now == now
+        assert restored.factors["volume"].alpha == calculator.factors["volume"].alpha
+        assert [step.name for step in restored.plan] == [step.name for step in calculator.plan]
+
+        # d_days默认使用解析式, 没有权重表
+        assert restored.factors["d_days"].analytic
+        assert restored.factors["d_days"]._weights is None
+        for name in ("rare", "volume"):
+            factor = restored.factors[name]
+            assert factor._weights is None
+            assert isinstance(factor._keys, np.memmap)
+            assert isinstance(factor._scaled_weights, np.memmap)
+            keys, table = factor._weight_table
+            assert isinstance(keys, np.memmap)
+            assert isinstance(table, np.memmap)
+            assert not table.flags.writeable
+
+        columns = {
+            "rare": {"rare": [1, 2339, 9432]},
+            "d_days": {"start_at": [now - timedelta(days=days) for days in (0, 10, 100)]},
+            "volume": {"volume": [0, 10, 100]},
+            "combination": {"ratio": [Decimal(1), Decimal("1.025"), Decimal(2)]},
+            "listing_stats": {"listing_start_at": [None, None, now - timedelta(days=3)], "listing_count": [0, 1, 5]},
+            "is_listing": {"is_listing": [False, False, False]},
+            "pop_user": {"is_pop_user": [True, True, True]},
+        }
+        expected = CPUCalculator(season_config.cpu, now=now)
+        expected.load_factors()
+        expected.factors["volume"].load_weights([0, 1, 10, 100])
+        assert list(map(str, restored.calculate_batch(columns).cpu)) == list(map(str, expected.calculate_batch(columns).cpu))
+        row = {name: {key: column[1] for key, column in value.items()} for name, value in columns.items()}
+        assert restored.calculate(row).cpu.as_tuple() == expected.calculate(row).cpu.as_tuple()
+
+    def test_invalid_file(self, tmp_path):
+        path = tmp_path / "invalid.snapshot"
+        path.write_bytes(b"NOTASNAP" + b"\0" * 32)
+
+        with pytest.raises(ValueError, match="Invalid snapshot file"):
+            load_snapshot(path)
@@ -0,0 +1,58 @@
+from datetime import datetime, timezone, timedelta
+from decimal import Decimal
+
+import pytest
+
+from pow2core.config.load_config import LoadMineSeasonConfig
+from pow2core.cpu.calculator import CPUCalculator
+from pow2core.cpu.stream import StreamingCPUCalculator, to_columns
+
+
+class TestStreamingCPUCalculator:
+    now = datetime.now(timezone.utc)
+
+    def load_calculator(self) -> CPUCalculator:
+        season_config = LoadMineSeasonConfig().load_config("example-s1")
+        calculator = CPUCalculator(season_config.cpu, now=self.now)
+        calculator.load_factors()
+        return calculator
+
+    def iter_rows(self, size: int):
+        for i in range(size):
+            yield {
+                "rare": {"rare": i % 9000 + 1},
+                "d_days": {"start_at": self.now - timedelta(days=i % 300)},
+                "combination": {"ratio": Decimal(1)},
+                "listing_stats": {"listing_start_at": None, "listing_count": i % 20},
+            }
+
+    def test_iter_cpus(self):
+        calculator = self.load_calculator()
+        stream = StreamingCPUCalculator(calculator, chunk_size=7)
+
+        cpus = list(stream.iter_cpus(self.iter_rows(50)))
+        assert cpus == [calculator.calculate(row).cpu for row in self.iter_rows(50)]
+
+    def test_iter_records(self):
+        calculator = self.load_calculator()
+        stream = StreamingCPUCalculator(calculator)
+
+        records = stream.iter_records(self.iter_rows(5))
+        assert [record.to_model() for record in records] == [calculator.calculate(row) for row in self.iter_rows(5)]
+
+    def test_write(self):
+        calculator = self.load_calculator()
+        stream = StreamingCPUCalculator(calculator, chunk_size=8)
+
+        chunk_sizes = []
+        total = stream.write(self.iter_rows(20), lambda result: chunk_sizes.append(len(result.cpu)))
+        assert total == 20
+        assert chunk_sizes == [8, 8, 4]
+
+    def test_to_columns(self):
+        rows = [{"rare": {"rare": 1}}, {"rare": {"rare": 2}}]
+        assert to_columns(rows) == {"rare": {"rare": [1, 2]}}
+
+    def test_invalid_chunk_size(self):
+        with pytest.raises(ValueError, match="Invalid chunk size"):
+            StreamingCPUCalculator(self.load_calculator(), chunk_size=0)
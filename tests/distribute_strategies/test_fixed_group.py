@@ -1,6 +1,8 @@
+import numpy as np
 import pytest
 
 from pow2core.distribute_strategies.fixed_group import FixedGroupStrategy
+from pow2core.distribute_strategies.schema import DistributionRun
 
 
 class TestFixedGroupStrategy:
@@ -214,3 +216,81 @@ class TestFixedGroupStrategy:
         result = strategy.get_all_distributions(5)
         expected = [0, 0, 0, 0, 0]
         assert result == expected
+
+    def test_get_distribution_array_by_rankings(self):
+        """测试按排名返回并列的钻石数组"""
+        user_groups = [3, 0, 2, 1]
+        diamond_groups = [100, 80, 50, 25]
+        strategy = FixedGroupStrategy(user_groups, diamond_groups)
+
+        result = strategy.get_distribution_array_by_rankings([5, 0, 3, 3, 2])
+
+        assert result.tolist() == [25, 100, 50, 50, 100]
+
+    def test_get_distribution_array_by_rankings_matches_all_distributions(self):
+        """测试二分查找结果和全部分配一致"""
+        user_groups = [1, 4, 10, 50, 200, 1000]
+        diamond_groups = [5000, 1000, 500, 100, 20, 1]
+        strategy = FixedGroupStrategy(user_groups, diamond_groups)
+        total_users = sum(user_groups)
+
+        all_distributions = strategy.get_all_distributions(total_users)
+        rankings = np.random.default_rng(0).integers(0, total_users, size=500)
+
+        result = strategy.get_distribution_array_by_rankings(rankings)
+        assert result.tolist() == [all_distributions[i] for i in rankings]
+        assert strategy.get_distributions_by_some_rankings(rankings.tolist()) == {
+            int(i): all_distributions[i] for i in rankings
+        }
+
+    def test_get_distribution_array_by_rankings_invalid(self):
+        """测试数组形式的排名校验"""
+        strategy = FixedGroupStrategy([2, 1], [100, 50])
+
+        assert strategy.get_distribution_array_by_rankings([]).tolist() == []
+        with pytest.raises(ValueError, match="无效排名:-1,排名不能为负数"):
+            strategy.get_distribution_array_by_rankings(np.array([0, -1]))
+        with pytest.raises(ValueError, match="无效排名:3超过预设最大人数3"):
+            strategy.get_distribution_array_by_rankings(np.array([3, 0]))
+
+    def test_get_all_distribution_array(self):
+        """测试数组形式的全部分配"""
+        user_groups = [5, 3, 2]
+        diamond_groups = [100, 50, 25]
+        strategy = FixedGroupStrategy(user_groups, diamond_groups)
+
+        result = strategy.get_all_distribution_array(7)
+
+        assert result.dtype == np.int64
+        assert result.tolist() == [100] * 5 + [50] * 2
+        assert strategy.get_all_distribution_array(0).tolist() == []
+        with pytest.raises(ValueError, match="总人数11超过预设人数10"):
+            strategy.get_all_distribution_array(11)
+        with pytest.raises(ValueError, match="预设人数和总人数不一致"):
+            strategy.get_all_distribution_array(7, strict=True)
+
+    def test_get_distribution_runs(self):
+        """测试游程编码形式的全部分配"""
+        user_groups = [5, 0, 3, 2]
+        diamond_groups = [100, 80, 50, 25]
+        strategy = FixedGroupStrategy(user_groups, diamond_groups)
+
+        result = strategy.get_distribution_runs(7)
+
+        assert result == [DistributionRun(0, 5, 100), DistributionRun(5, 7, 50)]
+        assert strategy.get_distribution_runs(0) == []
+
+        expanded = []
+        for start_ranking, end_ranking, diamonds in strategy.get_distribution_runs(10):
+            expanded.extend([diamonds] * (end_ranking - start_ranking))
+        assert expanded == strategy.get_all_distributions(10)
+
+    def test_get_distribution_by_ranking(self):
+        """测试获取一个排名的钻石分配"""
+        strategy = FixedGroupStrategy([3, 0, 2, 1], [100, 80, 50, 25])
+
+        assert [strategy.get_distribution_by_ranking(i) for i in range(6)] == strategy.get_all_distributions(6)
+        with pytest.raises(ValueError, match="无效排名:-1,排名不能为负数"):
+            strategy.get_distribution_by_ranking(-1)
+        with pytest.raises(ValueError, match="无效排名:6超过预设最大人数6"):
+            strategy.get_distribution_by_ranking(6)
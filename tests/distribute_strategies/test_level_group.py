@@ -1,7 +1,10 @@
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 
 from pow2core.distribute_strategies.level_group import LevelGroupStrategy
-from pow2core.distribute_strategies.schema import LevelGroupThresholdItem
+from pow2core.distribute_strategies.schema import GroupLayoutCacheInfo, LevelGroupThresholdItem
 
 
 class TestLevelGroupStrategy:
@@ -161,6 +164,79 @@ class TestLevelGroupStrategy:
         expected = [100] * 15 + [50] * 20 + [25] * 15
         assert result == expected
 
+    def test_get_all_distribution_array_and_runs(self):
+        """测试数组和游程编码形式的全部分配"""
+        group_ratios = [0.3, 0.4, 0.3]
+        base_diamond_groups = [100, 50, 25]
+        level_thresholds = [
+            LevelGroupThresholdItem(level=1, users=50, diamonds=2500)
+        ]
+        strategy = LevelGroupStrategy(group_ratios, base_diamond_groups, level_thresholds)
+
+        assert strategy.get_all_distribution_array(50).tolist() == strategy.get_all_distributions(50)
+        assert strategy.get_distribution_runs(50) == [(0, 15, 100), (15, 35, 50), (35, 50, 25)]
+
+    def test_get_layout_cache(self):
+        """测试按总人数缓存分组布局"""
+        group_ratios = [0.5, 0.5]
+        base_diamond_groups = [100, 50]
+        level_thresholds = [
+            LevelGroupThresholdItem(level=1, users=50, diamonds=2500)
+        ]
+        strategy = LevelGroupStrategy(group_ratios, base_diamond_groups, level_thresholds, cache_size=2)
+
+        layout = strategy.get_layout(50)
+        assert strategy.get_layout(50) is layout
+        assert strategy.get_distribution_by_ranking(total_users=50, ranking=25) == 50
+        assert strategy.cache_info() == GroupLayoutCacheInfo(hits=2, misses=1, maxsize=2, currsize=1)
+
+        strategy.get_layout(60)
+        strategy.get_layout(70)  # 淘汰最久没有使用的50
+        assert strategy.cache_info().currsize == 2
+        assert strategy.get_layout(50) is not layout
+        assert strategy.cache_info().misses == 4
+
+        strategy.cache_clear()
+        assert strategy.cache_info() == GroupLayoutCacheInfo(hits=0, misses=0, maxsize=2, currsize=0)
+
+    def test_get_layout_concurrent(self):
+        """测试多线程并发获取分组布局"""
+        group_ratios = [0.5, 0.5]
+        base_diamond_groups = [100, 50]
+        level_thresholds = [
+            LevelGroupThresholdItem(level=1, users=50, diamonds=2500)
+        ]
+        strategy = LevelGroupStrategy(group_ratios, base_diamond_groups, level_thresholds, cache_size=4)
+        uncached = LevelGroupStrategy(group_ratios, base_diamond_groups, level_thresholds, cache_size=0)
+        totals = [total for _ in range(200) for total in range(10, 30)]
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            boundaries = list(executor.map(lambda total: strategy.get_layout(total).boundaries, totals))
+
+        assert boundaries == [uncached.get_layout(total).boundaries for total in totals]
+        cache_info = strategy.cache_info()
+        assert cache_info.hits + cache_info.misses == len(totals)
+        assert cache_info.currsize <= 4
+
+        restored = pickle.loads(pickle.dumps(strategy))
+        assert restored.get_layout(10).boundaries == uncached.get_layout(10).boundaries
+
+    def test_get_layout_without_cache(self):
+        """测试关闭缓存"""
+        group_ratios = [0.5, 0.5]
+        base_diamond_groups = [100, 50]
+        level_thresholds = [
+            LevelGroupThresholdItem(level=1, users=50, diamonds=2500)
+        ]
+        strategy = LevelGroupStrategy(group_ratios, base_diamond_groups, level_thresholds, cache_size=0)
+
+        assert strategy.get_distributions_by_some_rankings(total_users=50, rankings=[0, 49]) == {0: 100, 49: 50}
+        assert strategy.get_layout(50) is not strategy.get_layout(50)
+        assert strategy.cache_info().currsize == 0
+
+        with pytest.raises(ValueError, match="缓存数量不能为负数"):
+            LevelGroupStrategy(group_ratios, base_diamond_groups, level_thresholds, cache_size=-1)
+
     def test_get_distributions_by_some_rankings_basic(self):
         """测试获取部分排名的钻石分配"""
         group_ratios = [0.5, 0.5]
@@ -176,6 +252,19 @@ class TestLevelGroupStrategy:
         expected = {0: 100, 25: 50, 49: 50}
         assert result == expected
 
+    def test_get_distribution_array_by_rankings(self):
+        """测试按排名返回并列的钻石数组"""
+        group_ratios = [0.5, 0.5]
+        base_diamond_groups = [100, 50]
+        level_thresholds = [
+            LevelGroupThresholdItem(level=1, users=50, diamonds=2500)
+        ]
+        strategy = LevelGroupStrategy(group_ratios, base_diamond_groups, level_thresholds)
+
+        result = strategy.get_distribution_array_by_rankings(total_users=50, rankings=[49, 0, 25])
+
+        assert result.tolist() == [50, 100, 50]
+
     def test_get_distributions_by_some_rankings_empty_rankings(self):
         """测试空排名列表的情况"""
         group_ratios = [0.5, 0.5]
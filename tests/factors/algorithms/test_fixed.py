@@ -94,3 +94,46 @@ class TestFactorByFixed:
         result = factor.get_weight(Decimal('999999999999.999'))
         assert result.value == Decimal('999999999999.999')
         assert result.weight == Decimal('888888888888.888')
+
+    def test_get_weight_batch(self):
+        weights = {1: Decimal('10.555'), 2: 20, 3: 30}
+        factor = FactorByFixed("test_factor", weights, max_weight=25, is_visible=True)
+
+        values = [3, 1, 2, 1]
+        result = factor.get_weight_batch(values)
+        assert result.tolist() == [float(factor.get_weight(value).weight) for value in values]
+        assert result.tolist() == [25.0, 10.56, 20.0, 10.56]
+
+    def test_get_weight_batch_caches_table(self):
+        factor = FactorByFixed("test_factor", {1: 10, 2: 20}, max_weight=30)
+
+        table = factor._weight_table
+        factor.get_weight_batch([1, 2])
+        assert factor._weight_table is table
+
+        factor.weights = {1: 5, 2: 6}
+        assert factor.get_weight_batch([1, 2]).tolist() == [5.0, 6.0]
+
+    def test_get_weight_batch_with_bool_keys(self):
+        factor = FactorByFixed("test_factor", {True: 0, False: 1})
+
+        assert factor.get_weight_batch([True, False, True]).tolist() == [0.0, 1.0, 0.0]
+
+    def test_get_weight_batch_missing_value(self):
+        factor = FactorByFixed("test_factor", {1: 10, 2: 20}, max_weight=30)
+
+        with pytest.raises(ValueError, match="Value 4.0 not in weight keys"):
+            factor.get_weight_batch([1, 4])
+
+    def test_precompute_weights(self):
+        weights = {1: Decimal('10.555'), 2: 20, 3: 30}
+        factor = FactorByFixed("test_factor", weights, max_weight=25, precompute=True)
+        reference = FactorByFixed("test_factor", weights, max_weight=25)
+
+        assert factor._quantized_weights == {1: Decimal('10.56'), 2: Decimal('20.00'), 3: Decimal('25.00')}
+        for value in weights:
+            assert factor.get_weight(value) == reference.get_weight(value)
+        assert factor.get_weight_batch([3, 1]).tolist() == [25.0, 10.56]
+
+        with pytest.raises(ValueError, match="Value 4 not in weight keys"):
+            factor.get_weight(4)
@@ -179,3 +179,24 @@ class TestFactorByLinear:
         result = factor.get_weight(1500000)  # Midpoint
         assert result.value == 1500000
         assert result.weight == Decimal("150.00")
+
+    def test_get_weight_batch_matches_get_weight(self):
+        factor = FactorByLinear(
+            "test_factor",
+            min_value=0,
+            max_value=1,
+            min_weight=Decimal("1"),
+            max_weight=Decimal("2"),
+        )
+
+        # 1.015 and similar values are decimal ties that np.rint alone rounds differently
+        values = [i / 1000 for i in range(-5, 1006)]
+        result = factor.get_weight_batch(values)
+        for value, weight in zip(values, result.tolist(), strict=True):
+            assert Decimal(str(weight)) == factor.get_weight(value).weight
+
+    def test_get_weight_batch_clipped(self):
+        factor = FactorByLinear("test_factor", min_value=10, max_value=100)
+
+        result = factor.get_weight_batch([Decimal(5), 10, 55, 100, 150])
+        assert result.tolist() == [1.0, 1.0, 3.0, 5.0, 5.0]
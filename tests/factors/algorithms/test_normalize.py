@@ -22,6 +22,17 @@ class TestFactorByNormalize:
         assert factor.alpha == 1.0
         assert len(factor._weights) == 5
 
+    def test_init_positional_params(self):
+        # 新增的选项只能用关键字传入, 原有的位置参数顺序不变
+        factor = FactorByNormalize("test_factor", [1, 2, 3], 1, "linear", None, 0, 10, 0.1, 0.1, 3, Decimal(5), False)
+
+        assert factor.precision == 3
+        assert factor.max_weight == Decimal(5)
+        assert factor.is_visible is False
+        assert factor.analytic is False
+        with pytest.raises(TypeError):
+            FactorByNormalize("test_factor", [1, 2, 3], 1, "linear", None, 0, 10, 0.1, 0.1, 3, Decimal(5), False, "grid")
+
     def test_init_invalid_method(self):
         values = [1, 2, 3]
         with pytest.raises(ValueError, match="Invalid normalization method: invalid"):
@@ -218,3 +229,219 @@ class TestFactorByNormalize:
         # Check precision
         decimal_places = len(str(weight.weight).split('.')[-1])
         assert decimal_places <= 4
+
+    def test_get_weight_batch(self):
+        values = [1, 2.5, Decimal('3.5'), 10]
+        factor = FactorByNormalize("test_factor", values, alpha=1, method="log", max_weight=Decimal('1.5'))
+
+        result = factor.get_weight_batch([10, 1, Decimal('3.5'), 2.5])
+        assert [Decimal(str(weight)) for weight in result.tolist()] == [
+            factor.get_weight(value).weight for value in [10, 1, Decimal('3.5'), 2.5]
+        ]
+
+    def test_get_weight_batch_caches_table(self):
+        factor = FactorByNormalize("test_factor", [1, 2, 3], alpha=1, method="linear", max_weight=Decimal(10))
+
+        table = factor._weight_table
+        assert table is not None
+        factor.get_weight_batch([1, 2])
+        assert factor._weight_table is table
+
+        factor.load_weights([1, 2, 3, 4])
+        assert factor._weight_table is not table
+        assert factor.get_weight_batch([4]).tolist() == [float(factor.get_weight(4).weight)]
+
+    def test_get_weight_batch_invalid_value(self):
+        factor = FactorByNormalize("test_factor", [1, 2, 3], alpha=1, method="linear")
+
+        with pytest.raises(ValueError, match="Value 4.0 not in weight nums"):
+            factor.get_weight_batch([1, 4])
+
+    def test_find_alpha_by_grid_matches_full_reload(self):
+        values = [0, 1, 3, 8, 20, 150, 1000]
+        factor = FactorByNormalize(
+            "test_factor",
+            values,
+            ratio=5.0,
+            min_alpha=0,
+            max_alpha=10,
+            alpha_step=0.01,
+            tolerance=0.1,
+            method="log",
+        )
+
+        # Reference: step alpha and reload all weights on every step
+        expected = 0
+        while True:
+            expected += 0.01
+            weights = factor._load_weights(values=values, alpha=expected)
+            if abs(max(weights.values()) / min(weights.values()) - 5.0) < 0.1:
+                break
+
+        assert factor.alpha == expected
+
+    def test_find_alpha_by_bisect(self):
+        values = [0, 1, 3, 8, 20, 150, 1000]
+        factor = FactorByNormalize(
+            "test_factor",
+            values,
+            ratio=5.0,
+            min_alpha=0,
+            max_alpha=10,
+            alpha_step=0.01,
+            tolerance=0.1,
+            method="log",
+            alpha_search="bisect",
+        )
+
+        weights = factor._weights
+        assert 0 < factor.alpha < 10
+        assert abs(max(weights.values()) / min(weights.values()) - 5.0) < 1e-6
+
+    def test_find_alpha_by_bisect_fails(self):
+        with pytest.raises(ValueError, match="Failed to find alpha for given ratio"):
+            FactorByNormalize(
+                "test_factor",
+                [1, 2, 3],
+                ratio=100.0,
+                tolerance=0.01,
+                max_alpha=1.0,
+                alpha_search="bisect",
+            )
+
+    def test_init_invalid_alpha_search(self):
+        with pytest.raises(ValueError, match="Invalid alpha search: invalid"):
+            FactorByNormalize("test_factor", [1, 2, 3], alpha=1, alpha_search="invalid")
+
+    def test_analytic_matches_weight_table(self):
+        values = [0, 1, 2.5, Decimal('3.5'), 10, 1000]
+        table_factor = FactorByNormalize("test_factor", values, alpha=1.5, method="log", max_weight=Decimal(5))
+        analytic_factor = FactorByNormalize(
+            "test_factor", values, alpha=1.5, method="log", max_weight=Decimal(5), analytic=True,
+        )
+
+        assert analytic_factor._weights is None
+        for value in values:
+            assert analytic_factor.get_weight(value).weight == table_factor.get_weight(value).weight
+        assert analytic_factor.get_weight_batch(values).tolist() == table_factor.get_weight_batch(values).tolist()
+
+    def test_analytic_value_outside_table(self):
+        factor = FactorByNormalize("test_factor", [1, 2, 3], alpha=1, method="linear", max_weight=Decimal(5), analytic=True)
+
+        # (4 + 1) / (1 + 1)
+        assert factor.get_weight(4).weight == Decimal('2.50')
+        assert factor.get_weight_batch([4, 100]).tolist() == [2.5, 5.0]
+
+    def test_precompute_weights(self):
+        values = [1, 2.5, Decimal('3.5'), 10]
+        factor = FactorByNormalize("test_factor", values, alpha=1, method="log", max_weight=Decimal('1.5'), precompute=True)
+        reference = FactorByNormalize("test_factor", values, alpha=1, method="log", max_weight=Decimal('1.5'))
+
+        assert len(factor._quantized_weights) == 4
+        for value in values:
+            assert factor.get_weight(value) == reference.get_weight(value)
+        assert factor.get_weight_batch(values).tolist() == reference.get_weight_batch(values).tolist()
+
+        factor.load_weights([1, 2])
+        assert len(factor._quantized_weights) == 2
+        with pytest.raises(ValueError, match="Value 10 not in weight nums"):
+            factor.get_weight(10)
+
+    def test_incremental_matches_reload(self):
+        params = {"method": "log", "ratio": 5, "min_alpha": 0, "max_alpha": 10, "alpha_step": 0.01, "tolerance": 0.1}
+        factor = FactorByNormalize("test_factor", [0, 1, 10, 100], max_weight=Decimal(10), incremental=True, **params)
+
+        factor.insert_value(Decimal('2.5'))
+        factor.insert_value(10)
+        factor.update_value(0, 3)
+        factor.delete_value(10)
+
+        values = [1, 10, 100, Decimal('2.5'), 3]
+        reference = FactorByNormalize("test_factor", values, max_weight=Decimal(10), incremental=True, **params)
+        assert factor.alpha == reference.alpha
+        assert factor._total == reference._total
+        for value in values:
+            assert factor.get_weight(value) == reference.get_weight(value)
+        assert factor.get_weight_batch(values).tolist() == reference.get_weight_batch(values).tolist()
+
+    def test_incremental_resolve_alpha_on_drift(self):
+        factor = FactorByNormalize(
+            "test_factor", [0, 1, 10], method="log", ratio=5, min_alpha=0, max_alpha=10, alpha_step=0.01,
+            tolerance=0.1, max_weight=Decimal(10), incremental=True,
+        )
+        alpha = factor.alpha
+
+        # 最大值不变, 比例不变, 不重新查找alpha
+        factor.insert_value(5)
+        assert factor.alpha == alpha
+
+        factor.insert_value(10000)
+        assert factor.alpha != alpha
+        ratio = factor.get_weight_batch([10000])[0] / factor.get_weight_batch([0])[0]
+        assert abs(ratio - 5) < 0.1
+
+    def test_incremental_errors(self):
+        factor = FactorByNormalize("test_factor", [1, 2, 3], alpha=1, incremental=True)
+        with pytest.raises(ValueError, match="Value 4 not in weight nums"):
+            factor.delete_value(4)
+
+        for value in (1, 2, 3):
+            factor.delete_value(value)
+        with pytest.raises(ValueError, match="Weights must be loaded"):
+            factor.get_weight(1)
+
+        with pytest.raises(ValueError, match="Incremental mode is not enabled"):
+            FactorByNormalize("test_factor", [1, 2, 3], alpha=1).insert_value(4)
+
+        factor = FactorByNormalize("test_factor", ratio=2, incremental=True)
+        with pytest.raises(ValueError, match="Weights must be loaded before updating values"):
+            factor.insert_value(4)
+
+    def test_array_storage_matches_dict(self):
+        values = [0, 1, 2.5, Decimal('3.5'), 10, 10, 1000]
+        dict_factor = FactorByNormalize("test_factor", values, alpha=1.5, method="log", max_weight=Decimal(5))
+        array_factor = FactorByNormalize(
+            "test_factor", values, alpha=1.5, method="log", max_weight=Decimal(5), storage="array",
+        )
+
+        assert array_factor._weights is None
+        assert array_factor._keys.tolist() == [0, 1, 2.5, 3.5, 10, 1000]
+        for value in values:
+            assert array_factor.get_weight(value) == dict_factor.get_weight(value)
+        assert array_factor.get_weight_batch(values).tolist() == dict_factor.get_weight_batch(values).tolist()
+
+        with pytest.raises(ValueError, match="Value 4 not in weight nums"):
+            array_factor.get_weight(4)
+        with pytest.raises(ValueError, match="not in weight nums"):
+            array_factor.get_weight_batch([1, 4])
+
+    def test_array_storage_allow_unseen(self):
+        factor = FactorByNormalize(
+            "test_factor", [1, 2, 3], alpha=1, method="linear", max_weight=Decimal(5), storage="array", allow_unseen=True,
+        )
+
+        # (4 + 1) / (1 + 1)
+        assert factor.get_weight(4).weight == Decimal('2.50')
+        assert factor.get_weight(2).weight == Decimal('1.50')
+        assert factor.get_weight_batch([4, 2, 100]).tolist() == [2.5, 1.5, 5.0]
+
+    def test_to_array_storage(self):
+        values = [0, 1, 2.5, Decimal('3.5'), 10, 10, 1000]
+        dict_factor = FactorByNormalize("test_factor", values, alpha=1.5, method="log", max_weight=Decimal(5))
+        factor = FactorByNormalize("test_factor", values, alpha=1.5, method="log", max_weight=Decimal(5), precompute=True)
+        factor.to_array_storage()
+
+        assert factor.storage == "array"
+        assert factor._weights is None
+        assert factor._quantized_weights is None
+        assert factor._keys.tolist() == [0, 1, 2.5, 3.5, 10, 1000]
+        for value in values:
+            assert factor.get_weight(value) == dict_factor.get_weight(value)
+        assert factor.get_weight_batch(values).tolist() == dict_factor.get_weight_batch(values).tolist()
+
+        with pytest.raises(ValueError, match="Value 4 not in weight nums"):
+            factor.get_weight(4)
+
+    def test_init_invalid_storage(self):
+        with pytest.raises(ValueError, match="Invalid storage: list"):
+            FactorByNormalize("test_factor", [1, 2, 3], alpha=1, storage="list")
@@ -191,3 +191,33 @@ class TestFactorByThreshold:
 
         assert factor.get_weight(10.0005).weight == Decimal('2.0000')
         assert factor.get_weight(9.9995).weight == Decimal('1.0000')
+
+    def test_get_weight_batch(self):
+        thresholds = [100, 50, 10]
+        weights = [5.0, 3.0, 1.0]
+        factor = FactorByThreshold("test_factor", thresholds, weights)
+
+        values = [150, 100, 99.9, 50, 10, 10.5]
+        result = factor.get_weight_batch(values)
+        assert result.tolist() == [float(factor.get_weight(value).weight) for value in values]
+
+    def test_get_weight_batch_below_min_threshold(self):
+        factor = FactorByThreshold("test_factor", [100, 50, 10], [5.0, 3.0, 1.0])
+
+        with pytest.raises(ValueError, match="less than min threshold 10"):
+            factor.get_weight_batch([50, 5])
+
+    def test_many_tiers_match_linear_scan(self):
+        thresholds = list(range(0, 1000, 7))
+        weights = [Decimal(i) / 100 for i in range(len(thresholds))]
+        factor = FactorByThreshold("test", thresholds, weights, max_weight=Decimal(10))
+
+        values = [0, 1, 6, 7, 8, 500, Decimal("699.5"), 993, 5000]
+        for value in values:
+            expected = next(
+                Decimal(str(weight))
+                for threshold, weight in zip(factor.thresholds, factor.weights, strict=True)
+                if value >= threshold
+            )
+            assert factor.get_weight(value).weight == expected
+        assert factor.get_weight_batch(values).tolist() == [float(factor.get_weight(value).weight) for value in values]
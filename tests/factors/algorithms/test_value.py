@@ -195,3 +195,12 @@ class TestFactorByValue:
 
         assert result1.value == 42.123
         assert result2.value == 42.123
+
+    def test_get_weight_batch(self):
+        factor = FactorByValue("test_factor", precision=3)
+
+        values = [2, Decimal("3.125"), 1.025]
+        result = factor.get_weight_batch(values)
+        assert [Decimal(str(weight)) for weight in result.tolist()] == [
+            factor.get_weight(value).weight for value in values
+        ]
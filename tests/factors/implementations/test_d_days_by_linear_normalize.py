@@ -1,6 +1,9 @@
 from datetime import datetime, timezone, timedelta
 from decimal import Decimal
 
+import numpy as np
+import pytest
+
 from pow2core.factors.implementations.d_days import DDaysFactorByLinearNormalize
 
 
@@ -44,3 +47,89 @@ class TestDDaysFactorByLinearNormalize:
         assert factor.get_weight(now-timedelta(days=4)).weight == Decimal("1.00")
         assert factor.get_weight(now-timedelta(days=146)).weight == Decimal("1.06")
         assert factor.get_weight(now-timedelta(days=206)).weight == Decimal("1.08")
+
+    def test_analytic(self):
+        created_at = datetime.strptime("2024-11-29 02:09:52", "%Y-%m-%d %H:%M:%S")
+        created_at = created_at.replace(tzinfo=timezone(timedelta(hours=0)))
+
+        now = datetime.strptime("2025-08-05 23:00:00", "%Y-%m-%d %H:%M:%S")
+        now = now.replace(tzinfo=timezone(timedelta(hours=8)))
+        factor = DDaysFactorByLinearNormalize(
+            created_at=created_at,
+            multiplier=10,
+            now=now,
+            tz_hours=8,
+            precision=2,
+            max_weight=1.1,
+            is_visible=True,
+        )
+        table_factor = DDaysFactorByLinearNormalize(
+            created_at=created_at, multiplier=10, now=now, max_weight=1.1, analytic=False,
+        )
+
+        # 默认使用解析式, 与权重表的结果一致
+        assert factor.analytic
+        assert factor._weights is None
+        assert factor.get_weight(now-timedelta(days=4)).weight == Decimal("1.00")
+        assert factor.get_weight(now-timedelta(days=146)).weight == Decimal("1.06")
+        assert factor.get_weight(now-timedelta(days=206)).weight == Decimal("1.08")
+
+        start_at = [now - timedelta(days=days) for days in range(0, len(table_factor.values))]
+        assert factor.get_weight_batch(start_at).tolist() == table_factor.get_weight_batch(start_at).tolist()
+        for dt in start_at[::50]:
+            assert factor.get_weight(dt).weight.as_tuple() == table_factor.get_weight(dt).weight.as_tuple()
+
+        # 早于合集创建时间的天数不在权重表中, 两种模式都抛出异常
+        before_created = created_at - timedelta(days=2)
+        for loaded_factor in (factor, table_factor):
+            with pytest.raises(ValueError, match="not in weight nums"):
+                loaded_factor.get_weight(before_created)
+            with pytest.raises(ValueError, match="not in weight nums"):
+                loaded_factor.get_weight_batch([now, before_created])
+            with pytest.raises(ValueError, match="not in weight nums"):
+                loaded_factor.get_weight_batch(np.array([int(before_created.timestamp())]))
+
+    def test_advance_to(self):
+        created_at = datetime.strptime("2024-11-29 02:09:52", "%Y-%m-%d %H:%M:%S")
+        created_at = created_at.replace(tzinfo=timezone(timedelta(hours=0)))
+
+        now = datetime.strptime("2025-08-05 23:00:00", "%Y-%m-%d %H:%M:%S")
+        now = now.replace(tzinfo=timezone(timedelta(hours=8)))
+        later = now + timedelta(days=30, hours=5)
+
+        for analytic in (False, True):
+            factor = DDaysFactorByLinearNormalize(
+                created_at=created_at, multiplier=10, now=now, analytic=analytic, max_weight=1.1,
+            )
+            factor.advance_to(later)
+            expected = DDaysFactorByLinearNormalize(
+                created_at=created_at, multiplier=10, now=later, analytic=analytic, max_weight=1.1,
+            )
+
+            assert factor.alpha == expected.alpha
+            start_at = [later - timedelta(days=days) for days in range(0, 280, 3)]
+            assert factor.get_weight_batch(start_at).tolist() == expected.get_weight_batch(start_at).tolist()
+            assert factor.get_weight(start_at[-1]) == expected.get_weight(start_at[-1])
+
+        with pytest.raises(ValueError, match="Can not advance"):
+            factor.advance_to(now)
+
+    def test_get_weight_batch_timestamps(self):
+        created_at = datetime.strptime("2024-11-29 02:09:52", "%Y-%m-%d %H:%M:%S")
+        created_at = created_at.replace(tzinfo=timezone(timedelta(hours=0)))
+
+        now = datetime.strptime("2025-08-05 23:00:00", "%Y-%m-%d %H:%M:%S")
+        now = now.replace(tzinfo=timezone(timedelta(hours=8)))
+        factor = DDaysFactorByLinearNormalize(created_at=created_at, multiplier=10, now=now, tz_hours=8, max_weight=1.1)
+
+        start_at = [now - timedelta(days=days, seconds=seconds) for days in (0, 1, 45, 146, 206) for seconds in (-1, 0, 1)]
+        expected = factor.get_weight_batch(start_at)
+
+        seconds = np.array([int(dt.timestamp()) for dt in start_at], dtype=np.int64)
+        assert factor.get_weight_batch(seconds).tolist() == expected.tolist()
+        assert factor.get_weight_batch(seconds.astype(np.float64)).tolist() == expected.tolist()
+        assert factor.get_weight_batch(seconds.astype("datetime64[s]")).tolist() == expected.tolist()
+        assert factor.get_days_batch(seconds).tolist() == [factor.get_days(dt) for dt in start_at]
+
+        with pytest.raises(ValueError, match="must not be empty"):
+            factor.get_weight_batch(np.array([np.nan]))
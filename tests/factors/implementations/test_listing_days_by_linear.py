@@ -1,6 +1,8 @@
 from datetime import datetime, timezone, timedelta
 from decimal import Decimal
 
+import numpy as np
+
 from pow2core.factors.implementations.listing_days import ListingDaysFactorByLinear
 
 
@@ -24,3 +26,24 @@ class TestListingDaysFactorByLinear:
         assert factor.get_weight(now-timedelta(days=10)).weight == Decimal("5.00")
         assert factor.get_weight(now-timedelta(days=11)).weight == Decimal("5.00")
         assert factor.get_weight(now-timedelta(days=110)).weight == Decimal("5.00")
+
+    def test_get_weight_batch_timestamps(self):
+        now = datetime.strptime("2025-08-07 02:00:00", "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc)
+        factor = ListingDaysFactorByLinear(
+            now=now,
+            tz_hours=8,
+            min_listing_days=1,
+            max_listing_days=10,
+            min_weight=1,
+            max_weight=5,
+            precision=2,
+        )
+
+        start_at = [None] + [now - timedelta(days=days, hours=hours) for days in (0, 4, 9, 110) for hours in (-1, 0, 1)]
+        expected = factor.get_weight_batch(start_at)
+
+        seconds = np.array([dt.timestamp() if dt else np.nan for dt in start_at], dtype=np.float64)
+        assert factor.get_weight_batch(seconds).tolist() == expected.tolist()
+        datetimes = seconds.astype("datetime64[s]")
+        datetimes[0] = np.datetime64("NaT")
+        assert factor.get_weight_batch(datetimes).tolist() == expected.tolist()
@@ -1,4 +1,7 @@
 from datetime import datetime, timezone, timedelta
+from decimal import Decimal
+
+import numpy as np
 
 from pow2core.factors.implementations.listing_days import ListingDaysFactorByLinear
 from pow2core.factors.implementations.listing_count import ListingCountFactorByThreshold
@@ -63,3 +66,86 @@ class TestListingDaysFactorByLinear:
         assert result.children[self.listing_days_factor.name].weight == listing_days_weight.weight
         assert result.children[self.listing_count_factor.name].value == listing_count
         assert result.children[self.listing_count_factor.name].weight == listing_count_weight.weight
+
+    def test_get_weight_record(self):
+        factor = ListingStatsFactor(
+            listing_days_factor=self.listing_days_factor,
+            listing_count_factor=self.listing_count_factor,
+        )
+        listing_start_at = self.now - timedelta(days=5)
+
+        record = factor.get_weight_record(listing_start_at, 20)
+        assert record.weight == self.listing_count_factor.get_weight(20).weight
+        assert set(record.children) == {self.listing_count_factor.name, self.listing_days_factor.name}
+        assert record.to_model() == factor.get_weight(listing_start_at, 20)
+
+    def test_get_weight_batch(self):
+        factor = ListingStatsFactor(
+            listing_days_factor=self.listing_days_factor,
+            listing_count_factor=self.listing_count_factor,
+        )
+        listing_start_at = [self.now - timedelta(days=days) for days in [0, 3, 5, 8, 12, 30]]
+        listing_count = [25, 15, 9, 0, 10, 3]
+
+        weights = factor.get_weight_batch(listing_start_at, listing_count)
+        for start_at, count, weight in zip(listing_start_at, listing_count, weights):
+            assert Decimal(str(weight)) == factor.get_weight(start_at, count).weight
+
+    def test_get_children_weight_batch(self):
+        factor = ListingStatsFactor(
+            listing_days_factor=self.listing_days_factor,
+            listing_count_factor=self.listing_count_factor,
+        )
+        listing_start_at = [self.now - timedelta(days=5), None, self.now - timedelta(days=2)]
+        listing_count = [20, 10, 1]
+
+        children = factor.get_children_weight_batch(listing_start_at, listing_count)
+        count_weights = children[self.listing_count_factor.name]
+        days_weights = children[self.listing_days_factor.name]
+        assert count_weights.tolist() == [0.25, 0.5, 1]
+        assert np.isnan(days_weights[:2]).all()
+        assert Decimal(str(days_weights[2])) == self.listing_days_factor.get_weight(listing_start_at[2]).weight
+
+    def test_get_weight_batch_skips_days(self):
+        factor = ListingStatsFactor(
+            listing_days_factor=self.listing_days_factor,
+            listing_count_factor=self.listing_count_factor,
+        )
+        listing_start_at = ["invalid", "invalid"]
+
+        weights = factor.get_weight_batch(listing_start_at, [10, 20])
+        assert weights.tolist() == [0.5, 0.25]
+
+    def test_get_weight_exponent_batch(self, monkeypatch):
+        listing_start_at = [self.now - timedelta(days=days) for days in [0, 3, 5, 8, 12, 30]] + [None]
+        listing_count = [25, 15, 9, 0, 10, 3, 20]
+        low_days_factor = ListingDaysFactorByLinear(
+            now=self.now,
+            tz_hours=8,
+            min_listing_days=1,
+            max_listing_days=10,
+            min_weight=Decimal("0.5"),
+            max_weight=5,
+            precision=2,
+        )
+
+        for listing_days_factor in (self.listing_days_factor, low_days_factor):
+            factor = ListingStatsFactor(
+                listing_days_factor=listing_days_factor,
+                listing_count_factor=self.listing_count_factor,
+            )
+            weights = factor.get_weight_batch(listing_start_at, listing_count)
+            exponents = factor.get_weight_exponent_batch(weights, listing_start_at, listing_count)
+            assert exponents.tolist() == [
+                factor.get_weight(start_at, count).weight.as_tuple().exponent
+                for start_at, count in zip(listing_start_at, listing_count)
+            ]
+
+        # 挂单天数权重不小于1时直接按权重区分, 不再计算挂单数量权重
+        factor = ListingStatsFactor(
+            listing_days_factor=self.listing_days_factor,
+            listing_count_factor=ListingCountFactorByThreshold(thresholds=[20, 10, 0], weights=[0.25, 0.5, 1]),
+        )
+        weights = factor.get_weight_batch(listing_start_at, listing_count)
+        monkeypatch.setattr(factor.listing_count_factor, "get_weight_batch", None)
+        assert len(factor.get_weight_exponent_batch(weights, listing_start_at, listing_count)) == len(weights)
@@ -17,3 +17,25 @@ class TestRareFactorByLinearNormalize:
         assert factor.get_weight(1).weight == Decimal("10.00")
         assert factor.get_weight(2339).weight == Decimal("7.77")
         assert factor.get_weight(9432).weight == Decimal("1.00")
+
+    def test_gcw_batch(self):
+        factor = RareFactorByLinearNormalize(
+            min_rare=1,
+            max_rare=9432,
+            alpha=1047,
+            precision=2,
+            max_weight=10,
+            is_visible=True,
+        )
+
+        assert factor.get_weight_batch([1, 2339, 9432]).tolist() == [10.0, 7.77, 1.0]
+
+    def test_gcw_analytic(self):
+        params = {"min_rare": 1, "max_rare": 9432, "alpha": 1047, "precision": 2, "max_weight": 10}
+        table_factor = RareFactorByLinearNormalize(**params)
+        analytic_factor = RareFactorByLinearNormalize(**params, analytic=True)
+
+        assert analytic_factor._weights is None
+        rares = list(range(1, 9433))
+        assert analytic_factor.get_weight_batch(rares).tolist() == table_factor.get_weight_batch(rares).tolist()
+        assert analytic_factor.get_weight(2339).weight == Decimal("7.77")
@@ -1,5 +1,7 @@
 from decimal import Decimal
 
+import numpy as np
+
 from pow2core.factors.implementations.slot import SlotFactorByFixed
 
 
@@ -13,7 +15,7 @@ class TestSlotFactorByFixed:
         assert factor.name == "slot"
         assert factor.rare_requirements == rare_requirements
         assert factor.precision == 2
-        assert factor.tokens_with_slot == []
+        assert factor.tokens_with_slot == set()
 
     def test_init_with_custom_precision(self):
         weights = {True: Decimal('10.5'), False: Decimal('5.2')}
@@ -178,3 +180,74 @@ class TestSlotFactorByFixed:
         # Test weights
         assert factor.get_weight(collection_id=1, token_id=1001).weight == Decimal('20.0')  # In slot
         assert factor.get_weight(collection_id=1, token_id=9999).weight == Decimal('2.0')   # Not in slot
+
+    def test_load_tokens_with_slot_deduplicates(self):
+        factor = SlotFactorByFixed({True: 10, False: 5}, {1: 1, 2: 1}, max_weight=Decimal(10))
+        rare_balances = {1: [(1, 101)], 2: [(1, 201)]}
+
+        factor.load_tokens_with_slot(rare_balances)
+        factor.load_tokens_with_slot(rare_balances)
+        assert factor.tokens_with_slot == {(1, 101), (1, 201)}
+
+    def test_load_tokens_with_slot_batch_and_remove(self):
+        factor = SlotFactorByFixed({True: 10, False: 5}, {1: 1, 2: 1}, max_weight=Decimal(10))
+        factor.load_tokens_with_slot_batch([
+            {1: [(1, 101)], 2: [(1, 201)]},
+            {1: [(1, 102), (1, 103)], 2: [(1, 202)]},
+            {1: [(1, 104)], 2: []},
+        ])
+        assert factor.tokens_with_slot == {(1, 101), (1, 201), (1, 102), (1, 202)}
+
+        factor.remove_tokens_with_slot([(1, 101), (1, 999)])
+        assert factor.tokens_with_slot == {(1, 201), (1, 102), (1, 202)}
+        assert factor.get_weight(1, 101).weight == Decimal("5.00")
+
+    def test_has_slot_batch(self):
+        factor = SlotFactorByFixed({True: 10, False: 5}, {1: 1}, max_weight=Decimal(10))
+        factor.tokens_with_slot = [(1, 101), (2, 2**32 - 1)]
+
+        collection_ids = np.array([1, 1, 2, 2])
+        token_ids = np.array([101, 102, 2**32 - 1, 0])
+        assert factor.has_slot_batch(collection_ids, token_ids).tolist() == [True, False, True, False]
+        assert factor.get_weight_batch(collection_ids, token_ids).tolist() == [10, 5, 10, 5]
+
+        # token_id超出打包范围时逐个查找
+        factor.tokens_with_slot = [(1, 2**70)]
+        assert factor.has_slot_batch([1, 1], [2**70, 101]).tolist() == [True, False]
+        assert factor.has_slot_batch([], []).tolist() == []
+        # 不能打包的结果也会缓存, 修改集合后才重新尝试打包
+        assert factor._packed_keys_ready and factor._packed_keys is None
+        factor.remove_tokens_with_slot([(1, 2**70)])
+        assert not factor._packed_keys_ready
+        assert factor.has_slot_batch([1], [101]).tolist() == [False]
+        assert factor._packed_keys.tolist() == []
+
+    def test_load_tokens_with_slot_table_matches_per_user(self):
+        rare_requirements = {1: 1, 2: 2, 3: 3}
+        rng = np.random.default_rng(0)
+        size = 2000
+        owners = rng.integers(0, 50, size)
+        rares = rng.integers(1, 5, size)
+        collection_ids = rng.integers(1, 3, size)
+        token_ids = np.arange(size)
+
+        factor = SlotFactorByFixed({True: 2, False: 1}, rare_requirements)
+        has_slot = factor.load_tokens_with_slot_table(owners, rares, collection_ids, token_ids)
+
+        expected = SlotFactorByFixed({True: 2, False: 1}, rare_requirements)
+        for owner in np.unique(owners).tolist():
+            rare_balances = {
+                rare: [
+                    (collection_id, token_id)
+                    for row_owner, row_rare, collection_id, token_id in zip(
+                        owners.tolist(), rares.tolist(), collection_ids.tolist(), token_ids.tolist(), strict=True,
+                    )
+                    if row_owner == owner and row_rare == rare
+                ]
+                for rare in rare_requirements
+            }
+            expected.load_tokens_with_slot(rare_balances)
+
+        assert factor.tokens_with_slot == expected.tokens_with_slot
+        assert has_slot.sum() == len(expected.tokens_with_slot)
+        assert not has_slot[rares == 4].any()
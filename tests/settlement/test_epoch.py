@@ -0,0 +1,137 @@
+from datetime import datetime, timezone, timedelta
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from pow2core.config.load_config import LoadMineSeasonConfig
+from pow2core.config.schema import DiamondConfig, MineSeasonConfig
+from pow2core.cpu.stream import to_columns
+from pow2core.distribute_strategies.const import DISTRIBUTE_STRATEGY_LEVEL_GROUP
+from pow2core.distribute_strategies.fixed_group import FixedGroupStrategy
+from pow2core.distribute_strategies.schema import LevelGroupStrategyConfig, LevelGroupThresholdItem
+from pow2core.settlement.epoch import EpochSettlement
+
+
+class TestEpochSettlement:
+    now = datetime.now(timezone.utc)
+
+    def load_config(self) -> MineSeasonConfig:
+        return LoadMineSeasonConfig().load_config("example-s1")
+
+    def get_rows(self, size: int) -> list[dict[str, dict]]:
+        return [
+            {
+                "rare": {"rare": i * 37 % 9000 + 1},
+                "d_days": {"start_at": self.now - timedelta(days=i % 300)},
+                "combination": {"ratio": Decimal(1)},
+                "listing_stats": {"listing_start_at": None, "listing_count": i % 20},
+            }
+            for i in range(size)
+        ]
+
+    def test_settle(self):
+        settlement = EpochSettlement(self.load_config(), now=self.now)
+        rows = self.get_rows(60)
+        owners = [f"owner-{i % 7}" for i in range(60)]
+
+        result = settlement.settle(owners, to_columns(rows))
+
+        expected_cpu = {}
+        for owner, row in zip(owners, rows):
+            expected_cpu[owner] = expected_cpu.get(owner, Decimal(0)) + settlement.calculator.calculate_cpu(row)
+        expected_owners = sorted(expected_cpu, key=lambda owner: -expected_cpu[owner])
+
+        assert result.owner.tolist() == expected_owners
+        assert result.cpu.tolist() == [expected_cpu[owner] for owner in expected_owners]
+        assert result.token_count.tolist() == [owners.count(owner) for owner in expected_owners]
+        assert result.ranking.tolist() == list(range(7))
+        assert result.diamonds.tolist() == settlement.strategy.get_all_distributions(7)
+        assert len(result.tokens.cpu) == 60
+
+    def test_settle_ties_and_zero_cpu(self):
+        settlement = EpochSettlement(self.load_config(), now=self.now)
+        rows = self.get_rows(3)
+        rows = [rows[0], rows[0], rows[0], rows[1]]
+        rows[3]["combination"]["ratio"] = Decimal(0)
+
+        result = settlement.settle(["c", "a", "b", "d"], to_columns(rows))
+
+        assert result.owner.tolist() == ["a", "b", "c", "d"]
+        assert result.ranking.tolist() == [0, 1, 2, -1]
+        assert result.diamonds.tolist()[-1] == 0
+
+    def test_settle_beyond_preset_users(self):
+        config = self.load_config()
+        settlement = EpochSettlement(config, now=self.now)
+        settlement.strategy = FixedGroupStrategy([1, 2], [100, 50])
+
+        result = settlement.settle(list(range(5)), to_columns(self.get_rows(5)))
+
+        assert result.diamonds.tolist() == [100, 50, 50, 0, 0]
+
+    def test_settle_per_epoch_diamonds(self):
+        config = self.load_config()
+        settlement = EpochSettlement(config, now=self.now)
+
+        # 默认使用赛季配置的每个周期钻石数量, 累计的钻石总数不超过该数量
+        assert settlement.per_epoch_diamonds == config.season.per_epoch_diamonds
+        total_users = settlement.strategy.boundaries[-1]
+        diamonds = settlement.get_diamonds(total_users)
+        expected = settlement.strategy.get_all_distribution_array(total_users)
+        assert diamonds.sum() == min(expected.sum(), config.season.per_epoch_diamonds)
+        assert (diamonds <= expected).all()
+
+        config = config.model_copy(update={"season": config.season.model_copy(update={"per_epoch_diamonds": 120})})
+        settlement = EpochSettlement(config, now=self.now)
+        settlement.strategy = FixedGroupStrategy([1, 2], [100, 50])
+        result = settlement.settle(list(range(5)), to_columns(self.get_rows(5)))
+        assert result.diamonds.tolist() == [100, 20, 0, 0, 0]
+
+        settlement = EpochSettlement(config, now=self.now, per_epoch_diamonds=1000)
+        settlement.strategy = FixedGroupStrategy([1, 2], [100, 50])
+        result = settlement.settle(list(range(5)), to_columns(self.get_rows(5)))
+        assert result.diamonds.tolist() == [100, 50, 50, 0, 0]
+
+        with pytest.raises(ValueError, match="Invalid per epoch diamonds: -1"):
+            EpochSettlement(config, now=self.now, per_epoch_diamonds=-1)
+
+    def test_settle_level_group(self):
+        config = self.load_config()
+        config = config.model_copy(update={
+            "diamond": DiamondConfig(
+                strategy=DISTRIBUTE_STRATEGY_LEVEL_GROUP,
+                config=LevelGroupStrategyConfig(
+                    thresholds=[LevelGroupThresholdItem(level=1, users=10, diamonds=1000)],
+                    group_ratios=[Decimal("0.5"), Decimal("0.5")],
+                    base_group_diamonds=[100, 50],
+                ),
+            ),
+        })
+        settlement = EpochSettlement(config, now=self.now)
+
+        result = settlement.settle(np.arange(20) % 10, to_columns(self.get_rows(20)))
+
+        assert result.diamonds.tolist() == [100] * 5 + [50] * 5
+
+    def test_settle_exact_ranks(self):
+        settlement = EpochSettlement(self.load_config(), now=self.now)
+        tiered = EpochSettlement(self.load_config(), now=self.now, exact_ranks=10)
+        rows = self.get_rows(2000)
+        owners = [i % 500 for i in range(2000)]
+
+        expected = settlement.settle(owners, to_columns(rows))
+        result = tiered.settle(owners, to_columns(rows))
+
+        assert result.owner[:10].tolist() == expected.owner[:10].tolist()
+        assert result.ranking[:10].tolist() == list(range(10))
+        assert result.diamonds.tolist() == expected.diamonds.tolist()
+        assert dict(zip(result.owner.tolist(), result.diamonds.tolist())) == dict(
+            zip(expected.owner.tolist(), expected.diamonds.tolist())
+        )
+
+    def test_settle_invalid_owners(self):
+        settlement = EpochSettlement(self.load_config(), now=self.now)
+
+        with pytest.raises(ValueError, match="Owners length 2 != values length 3"):
+            settlement.settle(["a", "b"], to_columns(self.get_rows(3)))
@@ -0,0 +1,43 @@
+import numpy as np
+
+from pow2core.distribute_strategies.fixed_group import FixedGroupStrategy
+from pow2core.settlement.ranking import rank_owners, rank_owners_by_tiers
+
+
+class TestRanking:
+    def test_rank_owners(self):
+        order, ranking = rank_owners(np.array([5, 0, 7, 5, 7]))
+
+        assert order.tolist() == [2, 4, 0, 3, 1]
+        assert ranking.tolist() == [2, -1, 0, 3, 1]
+
+    def test_rank_owners_by_tiers_matches_full_ranking(self):
+        strategy = FixedGroupStrategy([1, 2, 7, 20, 70, 900], [1000, 900, 700, 500, 100, 10])
+        cpu = np.random.default_rng(0).integers(0, 50, size=3000)  # 大量相同CPU和CPU为0
+
+        full_order, full_ranking = rank_owners(cpu)
+        for exact_ranks in [0, 3, 10, 25, 5000]:
+            order, ranking = rank_owners_by_tiers(cpu, strategy.boundaries, exact_ranks)
+
+            exact_end = min(exact_ranks, int((cpu > 0).sum()))
+            assert order[:exact_end].tolist() == full_order[:exact_end].tolist()
+            assert sorted(order.tolist()) == list(range(len(cpu)))
+            for start, end in zip([0] + strategy.boundaries, strategy.boundaries + [len(cpu)]):
+                assert set(order[start:end].tolist()) == set(full_order[start:end].tolist())
+            assert (ranking == -1).tolist() == (full_ranking == -1).tolist()
+
+    def test_rank_owners_by_tiers_ranking(self):
+        cpu = np.array([3, 9, 3, 0, 3, 8, 1])
+
+        order, ranking = rank_owners_by_tiers(cpu, [1, 3, 6], exact_ranks=1)
+
+        assert order.tolist() == [1, 0, 5, 2, 4, 6, 3]  # 第二组只确定成员, 组内按原来的顺序
+        assert ranking.tolist() == [1, 0, 3, -1, 3, 1, 3]
+
+    def test_rank_owners_by_tiers_object_cpu(self):
+        cpu = np.array([2 ** 70, 5, 2 ** 70, 0], dtype=object)
+
+        order, ranking = rank_owners_by_tiers(cpu, [1, 2], exact_ranks=0)
+
+        assert order.tolist() == [0, 2, 1, 3]
+        assert ranking.tolist() == [0, 2, 1, -1]